@@ -0,0 +1,377 @@
+"""
+Validation of generated CI pipeline files against compiled CI schemas and
+structural checks
+"""
+import hashlib
+import os
+import re
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+import yaml
+
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# Validation is on unless explicitly disabled
+VALIDATION_ENABLED = os.environ.get("DEVOPS_AGENT_CI_VALIDATION", "1") != "0"
+
+# Schemas use a JSON Schema subset: type, enum, properties, required,
+# additionalProperties, items, minItems and anyOf
+STRING_LIST = {"type": "array", "items": {"type": "string"}}
+SCRIPT = {"type": ["string", "array"], "items": {"type": "string"}, "minItems": 1}
+SCALAR_MAP = {"type": "object", "additionalProperties": {"type": ["string", "number", "boolean"]}}
+
+GITLAB_RESERVED_KEYS = ["stages", "default", "variables", "include", "workflow", "image",
+                        "services", "cache", "before_script", "after_script"]
+
+GITLAB_JOB_SCHEMA = {
+    "type": "object",
+    "required": ["script"],
+    "properties": {
+        "stage": {"type": "string"},
+        "image": {"type": ["string", "object"]},
+        "script": SCRIPT,
+        "before_script": SCRIPT,
+        "after_script": SCRIPT,
+        "variables": SCALAR_MAP,
+        "artifacts": {"type": "object", "properties": {"paths": STRING_LIST}},
+        "rules": {"type": "array", "items": {"type": "object"}},
+        "needs": {"type": "array"},
+        "cache": {"type": ["object", "array"]}
+    }
+}
+
+GITLAB_CI_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "stages": {**STRING_LIST, "minItems": 1},
+        "default": {"type": "object", "properties": {"image": {"type": ["string", "object"]}}},
+        "variables": SCALAR_MAP,
+        "include": {"type": ["string", "array", "object"]},
+        "workflow": {"type": "object"},
+        "image": {"type": ["string", "object"]},
+        "services": {"type": "array"},
+        "cache": {"type": ["object", "array"]},
+        "before_script": SCRIPT,
+        "after_script": SCRIPT
+    },
+    "additionalProperties": GITLAB_JOB_SCHEMA
+}
+
+GITHUB_STEP_SCHEMA = {
+    "type": "object",
+    "anyOf": [{"required": ["uses"]}, {"required": ["run"]}],
+    "properties": {
+        "name": {"type": "string"},
+        "uses": {"type": "string"},
+        "run": {"type": "string"},
+        "with": {"type": "object"},
+        "env": SCALAR_MAP
+    }
+}
+
+GITHUB_WORKFLOW_SCHEMA = {
+    "type": "object",
+    "required": ["on", "jobs"],
+    "properties": {
+        "name": {"type": "string"},
+        "on": {"type": ["string", "array", "object"]},
+        "env": SCALAR_MAP,
+        "jobs": {
+            "type": "object",
+            "additionalProperties": {
+                "type": "object",
+                "required": ["runs-on", "steps"],
+                "properties": {
+                    "runs-on": {"type": ["string", "array"]},
+                    "container": {"type": ["string", "object"]},
+                    "needs": {"type": ["string", "array"], "items": {"type": "string"}},
+                    "if": {"type": "string"},
+                    "steps": {"type": "array", "items": GITHUB_STEP_SCHEMA, "minItems": 1}
+                }
+            }
+        }
+    }
+}
+
+def _gitlab_references(document: Dict[str, Any]) -> Iterator[str]:
+    """Check that every job runs in a declared stage"""
+    stages = document.get("stages") or ["build", "test", "deploy"]
+    for name, job in document.items():
+        if not isinstance(name, str) or name in GITLAB_RESERVED_KEYS or name.startswith(".") or not isinstance(job, dict):
+            continue
+        stage = job.get("stage", "test")
+        if stage not in stages:
+            yield f"{name}.stage: stage {stage!r} is not declared in stages"
+
+def _github_references(document: Dict[str, Any]) -> Iterator[str]:
+    """Check that every job dependency names a job of the workflow"""
+    jobs = document.get("jobs") or {}
+    for name, job in jobs.items():
+        if not isinstance(job, dict):
+            continue
+        needs = job.get("needs", [])
+        for dependency in [needs] if isinstance(needs, str) else needs:
+            if dependency not in jobs:
+                yield f"jobs.{name}.needs: unknown job {dependency!r}"
+
+def _normalize_github(document: Any) -> Any:
+    """YAML 1.1 loads the ``on`` key as True; restore its name"""
+    if isinstance(document, dict) and True in document:
+        document = dict(document)
+        document["on"] = document.pop(True)
+    return document
+
+# Schemas by output file: (schema, document normalizer, reference checks)
+CI_SCHEMAS: Dict[str, Tuple[Dict[str, Any], Optional[Callable[[Any], Any]], Callable[[Any], Iterator[str]]]] = {
+    ".gitlab-ci.yml": (GITLAB_CI_SCHEMA, None, _gitlab_references),
+    ".github/workflows/ci.yml": (GITHUB_WORKFLOW_SCHEMA, _normalize_github, _github_references)
+}
+
+# Strings and comments are skipped whole; a lone quote is an unterminated string
+_JENKINS_TOKEN = re.compile(
+    r"//[^\n]*|/\*.*?\*/|'''.*?'''|\"\"\".*?\"\"\"|'(?:\\.|[^'\\\n])*'|\"(?:\\.|[^\"\\\n])*\"|['\"{}()]|\w+",
+    re.DOTALL
+)
+# Blocks that give a stage something to run
+JENKINS_STAGE_BODIES = ("steps", "stages", "parallel", "matrix")
+
+def _line_of(content: str, position: int) -> int:
+    """Line number of a position in a file"""
+    return content.count("\n", 0, position) + 1
+
+def check_jenkinsfile(content: str) -> Iterator[str]:
+    """
+    Check the structure of a declarative Jenkins pipeline
+
+    Braces and parentheses must balance, the ``pipeline`` block needs an
+    ``agent`` and ``stages``, and every stage needs steps.
+    """
+    root = {"name": "", "words": set(), "children": []}
+    stack = [root]
+    parens = 0
+    name, label = "", ""
+    for match in _JENKINS_TOKEN.finditer(content):
+        token = match.group()
+        if token in ("'", '"'):
+            yield f"line {_line_of(content, match.start())}: unterminated string"
+            return
+        if token.startswith(("//", "/*")):
+            continue
+        if token == "(":
+            parens += 1
+        elif token == ")":
+            parens -= 1
+            if parens < 0:
+                yield f"line {_line_of(content, match.start())}: unexpected ')'"
+                return
+        elif token == "{":
+            block = {"name": f"{name}({label})" if label else name, "words": set(), "children": []}
+            stack[-1]["children"].append(block)
+            stack.append(block)
+            name, label = "", ""
+        elif token == "}":
+            if len(stack) == 1:
+                yield f"line {_line_of(content, match.start())}: unexpected '}}'"
+                return
+            stack.pop()
+            name, label = "", ""
+        elif token[0] in "'\"":
+            if parens and not label:
+                label = token
+        else:
+            stack[-1]["words"].add(token)
+            if not parens:
+                name, label = token, ""
+
+    if len(stack) > 1:
+        yield f"{'.'.join(block['name'] for block in stack[1:])}: block is not closed"
+        return
+    if parens:
+        yield "unbalanced parentheses"
+        return
+
+    pipelines = [block for block in root["children"] if block["name"] == "pipeline"]
+    if not pipelines:
+        yield "missing pipeline block"
+        return
+    pipeline = pipelines[0]
+    if "agent" not in pipeline["words"]:
+        yield "pipeline: missing agent"
+    stages = [block for block in pipeline["children"] if block["name"] == "stages"]
+    if not stages:
+        yield "pipeline: missing stages"
+        return
+    stage_blocks = [block for block in stages[0]["children"] if block["name"].startswith("stage(")]
+    if not stage_blocks:
+        yield "pipeline.stages: expected at least 1 stage"
+    for stage in stage_blocks:
+        if not any(block["name"] in JENKINS_STAGE_BODIES for block in stage["children"]):
+            yield f"pipeline.stages.{stage['name']}: missing steps"
+
+# Checks for pipeline files that are not YAML
+TEXT_CHECKS: Dict[str, Callable[[str], Iterator[str]]] = {
+    "Jenkinsfile": check_jenkinsfile
+}
+
+_TYPE_CHECKS = {
+    "object": lambda value: isinstance(value, dict),
+    "array": lambda value: isinstance(value, list),
+    "string": lambda value: isinstance(value, str),
+    "number": lambda value: isinstance(value, (int, float)) and not isinstance(value, bool),
+    "boolean": lambda value: isinstance(value, bool)
+}
+
+CheckFunc = Callable[[Any, str], Iterator[str]]
+
+def compile_schema(schema: Dict[str, Any]) -> CheckFunc:
+    """
+    Compile a schema into a function yielding ``path: message`` errors
+
+    Keywords are resolved once here, so validating a document only walks
+    the document.
+    """
+    checks: List[CheckFunc] = []
+
+    if "type" in schema:
+        names = schema["type"] if isinstance(schema["type"], list) else [schema["type"]]
+        type_checks = [_TYPE_CHECKS[name] for name in names]
+        expected = " or ".join(names)
+        def check_type(value, path):
+            if not any(type_check(value) for type_check in type_checks):
+                yield f"{path}: expected {expected}, got {type(value).__name__}"
+        checks.append(check_type)
+
+    if "enum" in schema:
+        allowed = schema["enum"]
+        def check_enum(value, path):
+            if value not in allowed:
+                yield f"{path}: {value!r} is not one of {allowed}"
+        checks.append(check_enum)
+
+    if "required" in schema:
+        required = schema["required"]
+        def check_required(value, path):
+            if isinstance(value, dict):
+                for key in required:
+                    if key not in value:
+                        yield f"{path}: missing required key {key!r}"
+        checks.append(check_required)
+
+    properties = {key: compile_schema(sub) for key, sub in schema.get("properties", {}).items()}
+    additional = schema.get("additionalProperties", True)
+    additional_check = compile_schema(additional) if isinstance(additional, dict) else None
+    if properties or additional is not True:
+        def check_properties(value, path):
+            if not isinstance(value, dict):
+                return
+            for key, item in value.items():
+                item_path = f"{path}.{key}" if path else str(key)
+                if key in properties:
+                    yield from properties[key](item, item_path)
+                elif additional_check:
+                    yield from additional_check(item, item_path)
+                elif additional is False:
+                    yield f"{item_path}: unexpected key"
+        checks.append(check_properties)
+
+    if "items" in schema or "minItems" in schema:
+        item_check = compile_schema(schema["items"]) if "items" in schema else None
+        min_items = schema.get("minItems", 0)
+        def check_items(value, path):
+            if not isinstance(value, list):
+                return
+            if len(value) < min_items:
+                yield f"{path}: expected at least {min_items} items"
+            if item_check:
+                for position, item in enumerate(value):
+                    yield from item_check(item, f"{path}[{position}]")
+        checks.append(check_items)
+
+    if "anyOf" in schema:
+        alternatives = [compile_schema(sub) for sub in schema["anyOf"]]
+        def check_any_of(value, path):
+            if all(any(True for _ in alternative(value, path)) for alternative in alternatives):
+                yield f"{path}: does not match any allowed form"
+        checks.append(check_any_of)
+
+    def check(value, path=""):
+        for sub_check in checks:
+            yield from sub_check(value, path)
+    return check
+
+class CIValidator:
+    """
+    Validates generated CI files against schemas compiled once
+
+    Results are cached by content hash, so identical files across a batch
+    are parsed and validated once.
+    """
+
+    def __init__(self, schemas: Optional[Dict[str, Tuple]] = None, cache_size: int = 1024,
+                 text_checks: Optional[Dict[str, Callable[[str], Iterator[str]]]] = None):
+        self.validators = {
+            filename: (compile_schema(schema), normalize, references)
+            for filename, (schema, normalize, references) in (schemas or CI_SCHEMAS).items()
+        }
+        self.text_checks = TEXT_CHECKS if text_checks is None else text_checks
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[Tuple[str, bytes], Tuple[str, ...]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def validate(self, filename: str, content: str) -> List[str]:
+        """Return the errors in a CI file; files without a schema or check are not checked"""
+        if filename not in self.validators and filename not in self.text_checks:
+            return []
+
+        key = (filename, hashlib.blake2b(content.encode(), digest_size=16).digest())
+        errors = self._cache.get(key)
+        if errors is not None:
+            self.hits += 1
+            self._cache.move_to_end(key)
+            return list(errors)
+
+        self.misses += 1
+        errors = tuple(self._check(filename, content))
+        self._cache[key] = errors
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return list(errors)
+
+    def validate_files(self, files: Dict[str, str]) -> Dict[str, List[str]]:
+        """Validate several files, returning the errors of the invalid ones"""
+        results = {}
+        for filename, content in files.items():
+            errors = self.validate(filename, content)
+            if errors:
+                results[filename] = errors
+        return results
+
+    def _check(self, filename: str, content: str) -> Iterator[str]:
+        """Parse and validate one file"""
+        if filename in self.text_checks:
+            yield from self.text_checks[filename](content)
+            return
+
+        check, normalize, references = self.validators[filename]
+        try:
+            document = yaml.load(content, Loader=YAML_LOADER)
+        except yaml.YAMLError as e:
+            yield f"invalid YAML: {e}"
+            return
+
+        if normalize:
+            document = normalize(document)
+        errors = list(check(document))
+        yield from errors
+        if not errors:
+            yield from references(document)
+
+_validator: Optional[CIValidator] = None
+
+def get_validator() -> CIValidator:
+    """Return the shared validator, compiling the schemas on first use"""
+    global _validator
+    if _validator is None:
+        _validator = CIValidator()
+    return _validator
@@ -0,0 +1,253 @@
+"""
+Kubernetes agent for generating Kubernetes manifests
+"""
+import os
+import re
+from datetime import datetime
+from typing import Dict, Any, Iterable, Iterator, List, Tuple
+from devops_platform_agent.models import DevOpsPlatformState
+from devops_platform_agent.logging_config import logger
+import jinja2
+
+# Defaults shared by every service; per-service values override them
+BASE_SERVICE = {
+    "namespace": "default",
+    "version": "0.1.0",
+    "port": 8080,
+    "replicas": 2,
+    "min_replicas": 2,
+    "max_replicas": 10,
+    "cpu_target": 70,
+    "cpu_request": "100m",
+    "memory_request": "128Mi",
+    "cpu_limit": "500m",
+    "memory_limit": "512Mi",
+    "config": {}
+}
+
+DEPLOYMENT_TEMPLATE = """\
+apiVersion: apps/v1
+kind: Deployment
+metadata:
+  name: {{ name }}
+  namespace: {{ namespace }}
+  labels:
+    app: {{ name }}
+spec:
+  replicas: {{ replicas }}
+  selector:
+    matchLabels:
+      app: {{ name }}
+  template:
+    metadata:
+      labels:
+        app: {{ name }}
+    spec:
+      containers:
+        - name: {{ name }}
+          image: "{{ image }}"
+          ports:
+            - containerPort: {{ port }}
+          envFrom:
+            - configMapRef:
+                name: {{ name }}-config
+          securityContext:
+            runAsNonRoot: true
+            allowPrivilegeEscalation: false
+          resources:
+            requests:
+              cpu: {{ cpu_request }}
+              memory: {{ memory_request }}
+            limits:
+              cpu: {{ cpu_limit }}
+              memory: {{ memory_limit }}
+"""
+
+SERVICE_TEMPLATE = """\
+apiVersion: v1
+kind: Service
+metadata:
+  name: {{ name }}
+  namespace: {{ namespace }}
+  labels:
+    app: {{ name }}
+spec:
+  selector:
+    app: {{ name }}
+  ports:
+    - port: 80
+      targetPort: {{ port }}
+"""
+
+HPA_TEMPLATE = """\
+apiVersion: autoscaling/v2
+kind: HorizontalPodAutoscaler
+metadata:
+  name: {{ name }}
+  namespace: {{ namespace }}
+spec:
+  scaleTargetRef:
+    apiVersion: apps/v1
+    kind: Deployment
+    name: {{ name }}
+  minReplicas: {{ min_replicas }}
+  maxReplicas: {{ max_replicas }}
+  metrics:
+    - type: Resource
+      resource:
+        name: cpu
+        target:
+          type: Utilization
+          averageUtilization: {{ cpu_target }}
+"""
+
+CONFIGMAP_TEMPLATE = """\
+apiVersion: v1
+kind: ConfigMap
+metadata:
+  name: {{ name }}-config
+  namespace: {{ namespace }}
+data:
+{% for key, value in config.items() %}
+  {{ key }}: {{ value | string | tojson }}
+{% else %}
+  SERVICE_NAME: "{{ name }}"
+{% endfor %}
+"""
+
+# Templates are compiled once and shared by every request
+_ENVIRONMENT = jinja2.Environment(trim_blocks=True, lstrip_blocks=True, keep_trailing_newline=True)
+MANIFEST_TEMPLATES = {
+    "deployment": _ENVIRONMENT.from_string(DEPLOYMENT_TEMPLATE),
+    "service": _ENVIRONMENT.from_string(SERVICE_TEMPLATE),
+    "hpa": _ENVIRONMENT.from_string(HPA_TEMPLATE),
+    "configmap": _ENVIRONMENT.from_string(CONFIGMAP_TEMPLATE)
+}
+
+_NAME_PATTERN = re.compile(r"^[a-z0-9]([-a-z0-9]{0,61}[a-z0-9])?$")
+# Images must be pinned to a tag other than latest, or to a digest
+_IMAGE_PATTERN = re.compile(r"^[^\s\"'@]+(:(?!latest$)[\w][\w.-]*|@sha256:[0-9a-f]{64})$")
+_CONFIG_KEY_PATTERN = re.compile(r"^[-._a-zA-Z0-9]+$")
+_CPU_PATTERN = re.compile(r"^\d+(\.\d+)?m?$")
+_MEMORY_PATTERN = re.compile(r"^\d+(\.\d+)?([kMGTPE]|[KMGTPE]i)?$")
+
+# Integer fields and their lowest allowed value
+INTEGER_FIELDS = {
+    "port": 1,
+    "replicas": 0,
+    "min_replicas": 1,
+    "max_replicas": 1,
+    "cpu_target": 1
+}
+QUANTITY_FIELDS = {
+    "cpu_request": _CPU_PATTERN,
+    "cpu_limit": _CPU_PATTERN,
+    "memory_request": _MEMORY_PATTERN,
+    "memory_limit": _MEMORY_PATTERN
+}
+
+def build_workloads(services: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Merge service definitions over the shared defaults and validate them
+    """
+    workloads = []
+    for service in services:
+        workload = {**BASE_SERVICE, **service}
+
+        name = workload.get("name", "")
+        if not isinstance(name, str) or not _NAME_PATTERN.match(name):
+            raise ValueError(f"Invalid Kubernetes service name: {name!r}")
+        namespace = workload["namespace"]
+        if not isinstance(namespace, str) or not _NAME_PATTERN.match(namespace):
+            raise ValueError(f"Invalid namespace for service {name}: {namespace!r}")
+        for field, minimum in INTEGER_FIELDS.items():
+            value = workload[field]
+            if not isinstance(value, int) or isinstance(value, bool) or value < minimum:
+                raise ValueError(f"Invalid {field} for service {name}: {value!r}")
+        if workload["port"] > 65535:
+            raise ValueError(f"Invalid port for service {name}: {workload['port']!r}")
+        if workload["min_replicas"] > workload["max_replicas"]:
+            raise ValueError(f"min_replicas exceeds max_replicas for service {name}")
+        for field, pattern in QUANTITY_FIELDS.items():
+            value = workload[field]
+            if isinstance(value, bool) or not pattern.match(str(value)):
+                raise ValueError(f"Invalid {field} for service {name}: {value!r}")
+        workload.setdefault("image", f"{name}:{workload['version']}")
+        if not _IMAGE_PATTERN.match(workload["image"]):
+            raise ValueError(f"Invalid or unpinned image for service {name}: {workload['image']!r}")
+        for key in workload["config"]:
+            if not _CONFIG_KEY_PATTERN.match(key):
+                raise ValueError(f"Invalid config key for service {name}: {key!r}")
+
+        workloads.append(workload)
+    return workloads
+
+def iter_manifests(workloads: Iterable[Dict[str, Any]]) -> Iterator[Tuple[str, str]]:
+    """
+    Render manifests one at a time as (path, document) pairs
+    """
+    for workload in workloads:
+        for kind, template in MANIFEST_TEMPLATES.items():
+            yield f"k8s/{workload['name']}/{kind}.yaml", template.render(workload)
+
+def write_manifests(workloads: Iterable[Dict[str, Any]], output_dir: str) -> List[str]:
+    """
+    Stream rendered manifests to ``output_dir`` and return their relative paths
+    """
+    paths = []
+    for path, document in iter_manifests(workloads):
+        full_path = os.path.join(output_dir, path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, "w") as f:
+            f.write(document)
+        paths.append(path)
+    return paths
+
+async def k8s_agent_node(state: DevOpsPlatformState) -> Dict[str, Any]:
+    """
+    Kubernetes agent that generates Deployment, Service, HPA and ConfigMap
+    manifests for every requested service
+
+    With ``state.manifest_dir`` set the manifests are streamed to disk one
+    at a time and only their paths are kept in the state.
+    """
+    services = state.services
+    if not services:
+        # Fall back to the single application the CI/CD agent built
+        cicd_data = state.cicd_data or {}
+        services = [{"name": cicd_data.get("project_name", "my-app")}]
+
+    logger.info("Kubernetes agent processing", services=len(services))
+
+    try:
+        workloads = build_workloads(services)
+
+        # Store generated data
+        k8s_data = {"services": [workload["name"] for workload in workloads]}
+        if state.manifest_dir:
+            k8s_data["manifest_dir"] = state.manifest_dir
+            k8s_data["manifest_paths"] = write_manifests(workloads, state.manifest_dir)
+            manifest_count = len(k8s_data["manifest_paths"])
+        else:
+            k8s_data["manifests"] = dict(iter_manifests(workloads))
+            manifest_count = len(k8s_data["manifests"])
+
+        # Update state
+        state.completed_phases.append("k8s")
+        state.k8s_data = k8s_data
+
+        logger.info("Kubernetes manifests generated successfully", services=len(workloads), manifests=manifest_count)
+
+        return {
+            "k8s_data": k8s_data,
+            "message": f"Kubernetes manifests for {len(workloads)} services generated successfully"
+        }
+
+    except Exception as e:
+        logger.error("Kubernetes agent error", error=str(e))
+        state.errors.append({
+            "agent": "k8s",
+            "error": str(e),
+            "timestamp": datetime.now().isoformat()
+        })
+        return {"error": f"Error in Kubernetes agent: {e}"}
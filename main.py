@@ -2,43 +2,94 @@
 Main entry point for the DevOps Platform Agent
 """
 import asyncio
+import uuid
+from datetime import datetime
+from typing import Dict, Any, List, Optional
 from devops_platform_agent.models import DevOpsPlatformState
 from devops_platform_agent.supervisor_agent import supervisor_agent_node
 from devops_platform_agent.cicd_agent import cicd_agent_node
+from devops_platform_agent.k8s_agent import k8s_agent_node
+from devops_platform_agent.security_agent import security_agent_node, policy_digest
 from devops_platform_agent.logging_config import logger
+from devops_platform_agent.src.utils.fingerprint import PhaseFingerprints
+from devops_platform_agent.src.utils.profiler import WorkflowProfiler
 
-async def run_devops_workflow(user_request: str):
+# State fields each phase reads and writes, and the phases it builds on
+PHASE_SPECS = {
+    "cicd": {"inputs": ["user_request", "ci_targets"], "outputs": ["cicd_data"], "upstream": []},
+    "infra": {"inputs": ["user_request"], "outputs": ["infra_data"], "upstream": []},
+    "k8s": {"inputs": ["services", "manifest_dir", "cicd_data.project_name"], "outputs": ["k8s_data"], "upstream": []},
+    "monitoring": {"inputs": ["user_request"], "outputs": ["monitoring_data"], "upstream": ["k8s"]},
+    "security": {"inputs": [], "digests": {"policy": policy_digest}, "outputs": ["security_data"],
+                 "upstream": ["cicd", "infra", "k8s"]}
+}
+fingerprints = PhaseFingerprints(PHASE_SPECS)
+
+async def run_devops_workflow(user_request: str, profile: bool = False, profile_dir: str = "profiles",
+                              previous_state: Optional[DevOpsPlatformState] = None,
+                              services: Optional[List[Dict[str, Any]]] = None,
+                              ci_targets: Optional[List[str]] = None,
+                              manifest_dir: Optional[str] = None):
     """
     Run the complete DevOps workflow
+
+    ``services`` lists the microservices to generate Kubernetes manifests
+    for; without it a single service is derived from the CI/CD project.
+    ``ci_targets`` selects the CI systems to emit pipelines for (``gitlab``,
+    ``github``, ``jenkins``); GitLab CI by default. With ``manifest_dir``
+    Kubernetes manifests are streamed to that directory instead of being
+    kept in the state.
+
+    Passing the state of an earlier run as ``previous_state`` reuses the
+    outputs of every phase whose input fingerprint is unchanged.
+
+    With ``profile=True`` only this run is profiled; the CPU profile,
+    flamegraph stacks and per-phase breakdown are written to ``profile_dir``
+    and their paths are stored in ``state.profile_data``.
     """
-    logger.info("Starting DevOps workflow", request=user_request)
+    logger.info("Starting DevOps workflow", request=user_request, profile=profile)
     
     # Initialize state
-    state = DevOpsPlatformState(user_request=user_request)
+    state = DevOpsPlatformState(user_request=user_request, services=services,
+                                ci_targets=ci_targets or ["gitlab"], manifest_dir=manifest_dir)
+    PhaseFingerprints.inherit(state, previous_state)
+    profiler = WorkflowProfiler(f"workflow-{uuid.uuid4().hex[:12]}", profile_dir, enabled=profile)
+    profiler.start()
+    try:
+        await _run_workflow_loop(state, profiler)
+    finally:
+        profiler.stop()
     
-    # Run workflow until completion
+    if profile:
+        state.profile_data = profiler.write()
+    
+    logger.info("DevOps workflow completed", final_response=state.final_response)
+    return state
+
+async def _run_workflow_loop(state: DevOpsPlatformState, profiler: WorkflowProfiler):
+    """
+    Run agents chosen by the supervisor until the workflow finishes
+    """
     while not state.final_response:
         # Determine next agent
-        agent_result = await supervisor_agent_node(state)
+        with profiler.phase("supervisor"):
+            agent_result = await supervisor_agent_node(state)
         
         if "current_agent" in agent_result:
             agent_name = agent_result["current_agent"]
             
-            # Run the appropriate agent
-            if agent_name == "cicd_agent":
-                agent_result = await cicd_agent_node(state)
-            elif agent_name == "infra_agent":
-                # Placeholder for infrastructure agent
-                agent_result = {"message": "Infrastructure agent would run here"}
-            elif agent_name == "k8s_agent":
-                # Placeholder for Kubernetes agent
-                agent_result = {"message": "Kubernetes agent would run here"}
-            elif agent_name == "monitoring_agent":
-                # Placeholder for monitoring agent
-                agent_result = {"message": "Monitoring agent would run here"}
-            elif agent_name == "security_agent":
-                # Placeholder for security agent
-                agent_result = {"message": "Security agent would run here"}
+            # Run the appropriate agent, or reuse its outputs when its inputs are unchanged
+            phase = agent_name[:-len("_agent")]
+            fingerprint = None
+            with profiler.phase(agent_name):
+                if phase in PHASE_SPECS and fingerprints.is_current(phase, state):
+                    agent_result = fingerprints.restore(phase, state)
+                    if phase not in state.completed_phases:
+                        state.completed_phases.append(phase)
+                else:
+                    if phase in PHASE_SPECS:
+                        fingerprint = fingerprints.compute(phase, state)
+                    agent_result = await _run_agent(agent_name, state)
             
             # Update state with agent results
             if "error" in agent_result:
@@ -48,6 +99,11 @@ async def run_devops_workflow(user_request: str):
                     "error": agent_result["error"],
                     "timestamp": datetime.now().isoformat()
                 })
+                # A failing agent is selected again, so stop retrying it eventually
+                state.retry_count += 1
+                if state.retry_count >= 3:
+                    state.final_response = agent_result["error"]
+                    break
             else:
                 # Merge agent results into state
                 for key, value in agent_result.items():
@@ -56,6 +112,8 @@ async def run_devops_workflow(user_request: str):
                     else:
                         # Handle dynamic fields
                         setattr(state, key, value)
+                if fingerprint:
+                    fingerprints.record(phase, state, fingerprint, agent_result)
         elif "final_response" in agent_result:
             state.final_response = agent_result["final_response"]
             break
@@ -69,9 +127,26 @@ async def run_devops_workflow(user_request: str):
         if len(state.completed_phases) > 10:
             state.final_response = "Workflow exceeded maximum phases"
             break
-    
-    logger.info("DevOps workflow completed", final_response=state.final_response)
-    return state
+
+async def _run_agent(agent_name: str, state: DevOpsPlatformState) -> Dict[str, Any]:
+    """
+    Dispatch to the agent chosen by the supervisor
+    """
+    if agent_name == "cicd_agent":
+        return await cicd_agent_node(state)
+    elif agent_name == "infra_agent":
+        # Placeholder for infrastructure agent
+        state.completed_phases.append("infra")
+        return {"message": "Infrastructure agent would run here"}
+    elif agent_name == "k8s_agent":
+        return await k8s_agent_node(state)
+    elif agent_name == "monitoring_agent":
+        # Placeholder for monitoring agent
+        state.completed_phases.append("monitoring")
+        return {"message": "Monitoring agent would run here"}
+    elif agent_name == "security_agent":
+        return await security_agent_node(state)
+    return {"current_agent": agent_name}
 
 def main():
     """
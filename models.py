@@ -10,6 +10,9 @@ class DevOpsPlatformState(BaseModel):
     State model representing the current state of the DevOps platform workflow
     """
     user_request: str
+    services: Optional[List[Dict[str, Any]]] = None
+    ci_targets: List[str] = ["gitlab"]
+    manifest_dir: Optional[str] = None
     lifecycle_phase: Optional[str] = None
     current_agent: Optional[str] = None
     completed_phases: List[str] = []
@@ -23,6 +26,9 @@ class DevOpsPlatformState(BaseModel):
     k8s_data: Optional[Dict[str, Any]] = None
     monitoring_data: Optional[Dict[str, Any]] = None
     security_data: Optional[Dict[str, Any]] = None
+    profile_data: Optional[Dict[str, Any]] = None
+    phase_fingerprints: Dict[str, Dict[str, Any]] = {}
+    phase_outputs: Dict[str, Dict[str, Any]] = {}
     timestamp: datetime = datetime.now()
     
     class Config:
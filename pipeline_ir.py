@@ -0,0 +1,275 @@
+"""
+Pipeline intermediate representation and CI emitters
+"""
+from typing import Callable, Dict, List, Optional
+from pydantic import BaseModel
+import jinja2
+
+class Cache(BaseModel):
+    """
+    Dependency cache shared by every job of a pipeline
+
+    ``env`` points the package manager at the cache; emitters substitute
+    ``{root}`` with the directory their CI system persists.
+    """
+    paths: List[str]
+    key_files: List[str]
+    env: Dict[str, str] = {}
+
+class Job(BaseModel):
+    """A pipeline job"""
+    name: str
+    stage: str
+    script: List[str]
+    artifacts: List[str] = []
+    branches: List[str] = []
+
+class Pipeline(BaseModel):
+    """CI-system independent description of a pipeline"""
+    project_name: str
+    language: str
+    image: str
+    stages: List[str]
+    jobs: List[Job]
+    cache: Optional[Cache] = None
+
+# Build settings per language: image, commands and dependency cache
+LANGUAGE_PROFILES = {
+    "node": {
+        "project_name": "node-app",
+        "image": "node:18",
+        "build": ["npm ci --prefer-offline", "npm run build"],
+        "test": ["npm test"],
+        "artifacts": ["dist/"],
+        "cache": {"paths": [".npm/"], "key_files": ["package-lock.json"], "env": {"npm_config_cache": "{root}/.npm"}}
+    },
+    "python": {
+        "project_name": "python-app",
+        "image": "python:3.11",
+        "build": ["pip install -r requirements.txt"],
+        "test": ["pip install -r requirements.txt", "pytest"],
+        "artifacts": [],
+        "cache": {"paths": [".cache/pip/"], "key_files": ["requirements.txt"], "env": {"PIP_CACHE_DIR": "{root}/.cache/pip"}}
+    },
+    "java": {
+        "project_name": "java-app",
+        "image": "maven:3.9-eclipse-temurin-17",
+        "build": ["mvn -B -DskipTests package"],
+        "test": ["mvn -B test"],
+        "artifacts": ["target/*.jar"],
+        "cache": {"paths": [".m2/repository/"], "key_files": ["pom.xml"], "env": {"MAVEN_OPTS": "-Dmaven.repo.local={root}/.m2/repository"}}
+    }
+}
+
+def detect_language(user_request: str) -> str:
+    """Detect the project language from the user request"""
+    request = user_request.lower()
+    if "python" in request:
+        return "python"
+    if "java" in request and "javascript" not in request:
+        return "java"
+    return "node"
+
+def build_pipeline(user_request: str) -> Pipeline:
+    """
+    Analyse the request once and derive the pipeline every emitter renders
+    """
+    language = detect_language(user_request)
+    profile = LANGUAGE_PROFILES[language]
+
+    # Keep the generic name unless the request names the stack
+    project_name = profile["project_name"] if language in user_request.lower() else "my-app"
+
+    return Pipeline(
+        project_name=project_name,
+        language=language,
+        image=profile["image"],
+        stages=["build", "test", "deploy"],
+        jobs=[
+            Job(name="build", stage="build",
+                script=[f'echo "Building {project_name}..."', *profile["build"]],
+                artifacts=profile["artifacts"]),
+            Job(name="test", stage="test",
+                script=[f'echo "Running tests for {project_name}..."', *profile["test"]]),
+            Job(name="deploy", stage="deploy",
+                script=[f'echo "Deploying {project_name}..."', 'echo "Deployment script would go here"'],
+                branches=["main"])
+        ],
+        cache=Cache(**profile["cache"])
+    )
+
+GITLAB_CI_TEMPLATE = """\
+# Auto-generated GitLab CI configuration
+stages:
+{% for stage in pipeline.stages %}
+  - {{ stage }}
+{% endfor %}
+
+default:
+  image: {{ pipeline.image }}
+{% if pipeline.cache %}
+  cache:
+    key:
+      files:
+{% for file in pipeline.cache.key_files %}
+        - {{ file }}
+{% endfor %}
+    paths:
+{% for path in pipeline.cache.paths %}
+      - {{ path }}
+{% endfor %}
+
+variables:
+{% for name, value in pipeline.cache.env.items() %}
+  {{ name }}: {{ value | replace("{root}", "$CI_PROJECT_DIR") | tojson }}
+{% endfor %}
+{% endif %}
+{% for job in pipeline.jobs %}
+
+{{ job.name }}_job:
+  stage: {{ job.stage }}
+  script:
+{% for line in job.script %}
+    - {{ line | tojson }}
+{% endfor %}
+{% if job.artifacts %}
+  artifacts:
+    paths:
+{% for path in job.artifacts %}
+      - {{ path }}
+{% endfor %}
+{% endif %}
+{% if job.branches %}
+  rules:
+{% for branch in job.branches %}
+    - if: '$CI_COMMIT_BRANCH == "{{ branch }}"'
+{% endfor %}
+{% endif %}
+{% endfor %}
+"""
+
+GITHUB_ACTIONS_TEMPLATE = """\
+# Auto-generated GitHub Actions workflow
+name: {{ pipeline.project_name }} CI
+
+on:
+  push:
+  pull_request:
+
+{% if pipeline.cache %}
+env:
+{% for name, value in pipeline.cache.env.items() %}
+  {{ name }}: {{ value | replace("{root}", ".") | tojson }}
+{% endfor %}
+
+{% endif %}
+jobs:
+{% for job in pipeline.jobs %}
+  {{ job.name }}:
+    runs-on: ubuntu-latest
+    container: {{ pipeline.image }}
+{% if not loop.first %}
+    needs: {{ pipeline.jobs[loop.index0 - 1].name }}
+{% endif %}
+{% if job.branches %}
+    if: {{ "github.ref == 'refs/heads/" ~ job.branches | join("' || github.ref == 'refs/heads/") ~ "'" }}
+{% endif %}
+    steps:
+      - uses: actions/checkout@v4
+{% if pipeline.cache %}
+      - uses: actions/cache@v4
+        with:
+          path: |
+{% for path in pipeline.cache.paths %}
+            {{ path }}
+{% endfor %}
+          key: {{ pipeline.language }}-{{ "${{" }} hashFiles({% for file in pipeline.cache.key_files %}'{{ file }}'{% if not loop.last %}, {% endif %}{% endfor %}) {{ "}}" }}
+          restore-keys: {{ pipeline.language }}-
+{% endif %}
+{% for line in job.script %}
+      - run: {{ line | tojson }}
+{% endfor %}
+{% if job.artifacts %}
+      - uses: actions/upload-artifact@v4
+        with:
+          name: {{ job.name }}-artifacts
+          path: |
+{% for path in job.artifacts %}
+            {{ path }}
+{% endfor %}
+{% endif %}
+{% endfor %}
+"""
+
+JENKINSFILE_TEMPLATE = """\
+// Auto-generated Jenkins pipeline
+pipeline {
+    agent {
+        docker {
+            image '{{ pipeline.image }}'
+{% if pipeline.cache %}
+            args '-v {{ pipeline.project_name }}-ci-cache:/ci-cache'
+{% endif %}
+        }
+    }
+{% if pipeline.cache %}
+    environment {
+{% for name, value in pipeline.cache.env.items() %}
+        {{ name }} = '{{ value | replace("{root}", "/ci-cache") }}'
+{% endfor %}
+    }
+{% endif %}
+    stages {
+{% for job in pipeline.jobs %}
+        stage('{{ job.stage }}') {
+{% if job.branches %}
+            when {
+{% for branch in job.branches %}
+                branch '{{ branch }}'
+{% endfor %}
+            }
+{% endif %}
+            steps {
+{% for line in job.script %}
+                sh {{ line | tojson | replace("$", "\\$") }}
+{% endfor %}
+{% if job.artifacts %}
+                archiveArtifacts artifacts: '{{ job.artifacts | join(",") }}'
+{% endif %}
+            }
+        }
+{% endfor %}
+    }
+}
+"""
+
+# Templates are compiled once and shared by every request
+_ENVIRONMENT = jinja2.Environment(trim_blocks=True, lstrip_blocks=True, keep_trailing_newline=True)
+
+EmitterFunc = Callable[[Pipeline], str]
+
+def template_emitter(source: str) -> EmitterFunc:
+    """Create an emitter from a template rendered with ``pipeline``"""
+    template = _ENVIRONMENT.from_string(source)
+    return lambda pipeline: template.render(pipeline=pipeline)
+
+# Emitters by CI target: (output file, emitter)
+EMITTERS: Dict[str, tuple] = {
+    "gitlab": (".gitlab-ci.yml", template_emitter(GITLAB_CI_TEMPLATE)),
+    "github": (".github/workflows/ci.yml", template_emitter(GITHUB_ACTIONS_TEMPLATE)),
+    "jenkins": ("Jenkinsfile", template_emitter(JENKINSFILE_TEMPLATE))
+}
+
+def register_emitter(target: str, filename: str, emitter: EmitterFunc):
+    """Register an emitter for another CI system"""
+    EMITTERS[target] = (filename, emitter)
+
+def emit(pipeline: Pipeline, targets: List[str]) -> Dict[str, str]:
+    """Render the pipeline for each CI target, keyed by output file"""
+    files = {}
+    for target in targets:
+        if target not in EMITTERS:
+            raise ValueError(f"Unknown CI target: {target}")
+        filename, emitter = EMITTERS[target]
+        files[filename] = emitter(pipeline)
+    return files
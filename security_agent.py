@@ -0,0 +1,416 @@
+"""
+Security agent for scanning generated artifacts against policy rules
+"""
+import asyncio
+import json
+import multiprocessing
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+from pydantic import BaseModel
+from devops_platform_agent.models import DevOpsPlatformState
+from devops_platform_agent.logging_config import logger
+from devops_platform_agent.src.utils.fingerprint import hash_value
+import yaml
+
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# Scans smaller than this run inline; process startup would cost more
+PARALLEL_THRESHOLD = 256
+# Parallel scans hand each worker at least this many artifacts at a time
+MIN_CHUNK_SIZE = 64
+
+_MISSING = object()
+
+class PolicyRule(BaseModel):
+    """Model for a policy rule applied to one resource type at one key path"""
+    id: str
+    resource_type: str
+    key_path: str
+    check: str
+    expected: Any = None
+    severity: str = "medium"
+    message: str
+
+DEFAULT_RULES = [
+    # Kubernetes
+    {"id": "K8S001", "resource_type": "Deployment", "key_path": "spec.template.spec.containers[].securityContext.runAsNonRoot",
+     "check": "equals", "expected": True, "severity": "high", "message": "Containers should run as non-root"},
+    {"id": "K8S002", "resource_type": "Deployment", "key_path": "spec.template.spec.containers[].securityContext.privileged",
+     "check": "not_equals", "expected": True, "severity": "critical", "message": "Containers must not be privileged"},
+    {"id": "K8S003", "resource_type": "Deployment", "key_path": "spec.template.spec.containers[].securityContext.allowPrivilegeEscalation",
+     "check": "equals", "expected": False, "severity": "medium", "message": "Privilege escalation should be disabled"},
+    {"id": "K8S004", "resource_type": "Deployment", "key_path": "spec.template.spec.containers[].resources.limits.memory",
+     "check": "required", "severity": "medium", "message": "Containers should set a memory limit"},
+    {"id": "K8S005", "resource_type": "Deployment", "key_path": "spec.template.spec.containers[].image",
+     "check": "not_matches", "expected": r":latest$|^[^:]+$", "severity": "medium", "message": "Images should be pinned to a version"},
+    {"id": "K8S006", "resource_type": "Deployment", "key_path": "spec.template.spec.hostNetwork",
+     "check": "not_equals", "expected": True, "severity": "high", "message": "Pods must not use the host network"},
+    {"id": "K8S007", "resource_type": "Service", "key_path": "spec.type",
+     "check": "not_equals", "expected": "NodePort", "severity": "low", "message": "Services should not be exposed with NodePort"},
+    # Terraform
+    {"id": "TF001", "resource_type": "aws_s3_bucket", "key_path": "acl",
+     "check": "not_in", "expected": ["public-read", "public-read-write"], "severity": "critical", "message": "S3 buckets must not be public"},
+    {"id": "TF002", "resource_type": "aws_security_group", "key_path": "ingress[].cidr_blocks",
+     "check": "not_matches", "expected": r"0\.0\.0\.0/0", "severity": "high", "message": "Security groups should not allow ingress from anywhere"},
+    {"id": "TF003", "resource_type": "aws_db_instance", "key_path": "publicly_accessible",
+     "check": "not_equals", "expected": "true", "severity": "critical", "message": "Databases must not be publicly accessible"},
+    {"id": "TF004", "resource_type": "aws_db_instance", "key_path": "storage_encrypted",
+     "check": "equals", "expected": "true", "severity": "high", "message": "Database storage should be encrypted"},
+    {"id": "TF005", "resource_type": "aws_instance", "key_path": "associate_public_ip_address",
+     "check": "not_equals", "expected": "true", "severity": "medium", "message": "Instances should not get public IP addresses"},
+    # GitLab CI
+    {"id": "GL001", "resource_type": "gitlab-ci", "key_path": "*.image",
+     "check": "not_matches", "expected": r":latest$", "severity": "low", "message": "CI job images should be pinned to a version"},
+    {"id": "GL002", "resource_type": "gitlab-ci", "key_path": "*.script",
+     "check": "not_matches", "expected": r"curl[^|]*\|\s*(ba)?sh", "severity": "high", "message": "CI jobs should not pipe downloads into a shell"},
+    # GitHub Actions
+    {"id": "GH001", "resource_type": "github-actions", "key_path": "jobs.*.container",
+     "check": "not_matches", "expected": r":latest$|^[^:]+$", "severity": "low", "message": "CI job images should be pinned to a version"},
+    {"id": "GH002", "resource_type": "github-actions", "key_path": "jobs.*.steps[].run",
+     "check": "not_matches", "expected": r"curl[^|]*\|\s*(ba)?sh", "severity": "high", "message": "CI jobs should not pipe downloads into a shell"},
+    # Jenkins pipelines are scanned as text
+    {"id": "JK001", "resource_type": "jenkinsfile", "key_path": "",
+     "check": "not_matches", "expected": r"image\s+'([^':]+|[^']*:latest)'", "severity": "low", "message": "CI job images should be pinned to a version"},
+    {"id": "JK002", "resource_type": "jenkinsfile", "key_path": "",
+     "check": "not_matches", "expected": r"curl[^|\n]*\|\s*(ba)?sh", "severity": "high", "message": "CI jobs should not pipe downloads into a shell"}
+]
+
+# Generated CI files by name: (resource type, format)
+CI_ARTIFACTS = {
+    ".gitlab-ci.yml": ("gitlab-ci", "yaml"),
+    ".github/workflows/ci.yml": ("github-actions", "yaml"),
+    "Jenkinsfile": ("jenkinsfile", "text")
+}
+
+def _check_equals(value: Any, expected: Any) -> bool:
+    return value == expected
+
+def _check_not_equals(value: Any, expected: Any) -> bool:
+    return value is _MISSING or value != expected
+
+def _check_required(value: Any, expected: Any) -> bool:
+    return value is not _MISSING and value is not None
+
+def _check_not_in(value: Any, expected: Any) -> bool:
+    return value is _MISSING or value not in expected
+
+def _check_not_matches(value: Any, expected: "re.Pattern") -> bool:
+    if value is _MISSING or value is None:
+        return True
+    values = value if isinstance(value, list) else [value]
+    return not any(expected.search(str(item)) for item in values)
+
+CHECKS = {
+    "equals": _check_equals,
+    "not_equals": _check_not_equals,
+    "required": _check_required,
+    "not_in": _check_not_in,
+    "not_matches": _check_not_matches
+}
+
+class PolicyIndex:
+    """
+    Rules indexed by resource type, then by key path
+
+    Each artifact is only checked against the rules for its resource type
+    (plus ``*`` rules), and each key path is resolved once for all rules
+    that share it. The serialized rules and their digest are kept for
+    worker processes and phase fingerprints.
+    """
+
+    def __init__(self, rules: List[PolicyRule]):
+        self.rule_dicts = [rule.model_dump() for rule in rules]
+        self.digest = hash_value(self.rule_dicts)
+        self.by_type: Dict[str, Dict[Tuple[str, ...], List[Tuple[PolicyRule, Any, Any]]]] = {}
+        for rule in rules:
+            if rule.check not in CHECKS:
+                raise ValueError(f"Unknown check {rule.check!r} in policy rule {rule.id}")
+            expected = re.compile(rule.expected) if rule.check == "not_matches" else rule.expected
+            by_path = self.by_type.setdefault(rule.resource_type, {})
+            by_path.setdefault(_split_path(rule.key_path), []).append((rule, CHECKS[rule.check], expected))
+
+    def rules_for(self, resource_type: str) -> Iterator[Tuple[Tuple[str, ...], List[Tuple[PolicyRule, Any, Any]]]]:
+        """Yield (key path, rules) groups that apply to a resource type"""
+        for indexed_type in (resource_type, "*"):
+            yield from self.by_type.get(indexed_type, {}).items()
+
+    def scan(self, artifact_id: str, resource_type: str, document: Any) -> List[Dict[str, Any]]:
+        """Check one parsed artifact and return its findings"""
+        findings = []
+        for path, rules in self.rules_for(resource_type):
+            values = list(_resolve(document, path))
+            for rule, check, expected in rules:
+                if not all(check(value, expected) for value in values):
+                    findings.append({
+                        "rule_id": rule.id,
+                        "severity": rule.severity,
+                        "artifact": artifact_id,
+                        "resource_type": resource_type,
+                        "key_path": rule.key_path,
+                        "message": rule.message
+                    })
+        return findings
+
+def _split_path(key_path: str) -> Tuple[str, ...]:
+    """Split ``a.b[].c`` into ("a", "b", "[]", "c")"""
+    segments = []
+    for part in key_path.split("."):
+        if part.endswith("[]"):
+            segments.extend([part[:-2], "[]"])
+        else:
+            segments.append(part)
+    return tuple(segment for segment in segments if segment)
+
+def _resolve(document: Any, path: Tuple[str, ...]) -> Iterator[Any]:
+    """Yield every value at a key path, expanding ``[]`` lists and ``*`` keys"""
+    if not path:
+        yield document
+        return
+
+    segment, rest = path[0], path[1:]
+    if segment == "[]":
+        items = document if isinstance(document, list) else [document]
+    elif segment == "*":
+        items = list(document.values()) if isinstance(document, dict) else []
+    elif isinstance(document, dict) and segment in document:
+        items = [document[segment]]
+    else:
+        yield _MISSING
+        return
+
+    for item in items:
+        if segment == "*" and not isinstance(item, dict):
+            continue
+        yield from _resolve(item, rest)
+
+_HCL_ATTRIBUTE = re.compile(r'^\s*([\w-]+)\s*=\s*(.+?)\s*$')
+_HCL_BLOCK = re.compile(r'^\s*([\w-]+)\s*(?:"[^"]*"\s*)*\{\s*$')
+
+def parse_hcl_body(body: str) -> Dict[str, Any]:
+    """
+    Parse the attributes and nested blocks of a Terraform resource body
+
+    Nested blocks become lists of dicts so repeated blocks such as
+    ``ingress`` are all checked; attribute values are kept as strings.
+    """
+    root: Dict[str, Any] = {}
+    stack = [root]
+    for line in body.splitlines():
+        block = _HCL_BLOCK.match(line)
+        if block:
+            child: Dict[str, Any] = {}
+            stack[-1].setdefault(block.group(1), []).append(child)
+            stack.append(child)
+        elif line.strip() == "}":
+            if len(stack) > 1:
+                stack.pop()
+        else:
+            attribute = _HCL_ATTRIBUTE.match(line)
+            if attribute and attribute.group(2) == "{":
+                # Map attribute such as ``tags = {``
+                child = {}
+                stack[-1][attribute.group(1)] = child
+                stack.append(child)
+            elif attribute:
+                stack[-1][attribute.group(1)] = attribute.group(2).strip('"')
+    return root
+
+def parse_artifact(artifact: Tuple[str, str, str, Any]) -> List[Tuple[str, str, Any]]:
+    """
+    Turn a raw artifact into (artifact id, resource type, document) entries
+    """
+    artifact_id, resource_type, fmt, content = artifact
+    if fmt == "yaml":
+        documents = [doc for doc in yaml.load_all(content, Loader=YAML_LOADER) if doc]
+        if resource_type == "k8s":
+            return [(artifact_id, doc.get("kind", ""), doc) for doc in documents if isinstance(doc, dict)]
+        return [(artifact_id, resource_type, doc) for doc in documents]
+    if fmt == "hcl":
+        return [(artifact_id, resource_type, parse_hcl_body(content))]
+    return [(artifact_id, resource_type, content)]
+
+def collect_artifacts(state: DevOpsPlatformState) -> List[Tuple[str, str, str, Any]]:
+    """
+    Gather the artifacts produced earlier in the workflow
+    """
+    artifacts = []
+
+    cicd_data = state.cicd_data or {}
+    for filename, (resource_type, fmt) in CI_ARTIFACTS.items():
+        if cicd_data.get(filename):
+            artifacts.append((filename, resource_type, fmt, cicd_data[filename]))
+
+    infra_data = state.infra_data or {}
+    terraform_config = infra_data.get("terraform_config", infra_data)
+    for resource in terraform_config.get("resources", []):
+        if isinstance(resource, dict) and resource.get("type"):
+            artifact_id = f"terraform/{resource['type']}.{resource.get('name', '')}"
+            artifacts.append((artifact_id, resource["type"], "hcl", resource.get("body", "")))
+
+    k8s_data = state.k8s_data or {}
+    for path, document in k8s_data.get("manifests", {}).items():
+        artifacts.append((path, "k8s", "yaml", document))
+    # Manifests streamed to disk are read back for the scan
+    for path in k8s_data.get("manifest_paths", []):
+        with open(os.path.join(k8s_data["manifest_dir"], path)) as f:
+            artifacts.append((path, "k8s", "yaml", f.read()))
+
+    return artifacts
+
+_worker_index: Optional[PolicyIndex] = None
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_key: Optional[Tuple[str, int]] = None
+_pool_lock = threading.Lock()
+
+def _get_pool(index: PolicyIndex, workers: int) -> ProcessPoolExecutor:
+    """
+    Return the shared scan pool, created on first use and replaced only
+    when the rules or the worker limit change
+    """
+    global _pool, _pool_key
+    key = (index.digest, workers)
+    with _pool_lock:
+        if _pool is None or _pool_key != key:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            # Spawned workers are safe to start from the agent's worker
+            # thread and are only started as chunks need them
+            _pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(index.rule_dicts,)
+            )
+            _pool_key = key
+        return _pool
+
+def shutdown_pool():
+    """Stop the shared scan pool's worker processes"""
+    global _pool, _pool_key
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+        _pool, _pool_key = None, None
+
+def _init_worker(rules: List[Dict[str, Any]]):
+    """Build the policy index once per worker process"""
+    global _worker_index
+    _worker_index = PolicyIndex([PolicyRule(**rule) for rule in rules])
+
+def _scan_chunk(chunk: List[Tuple[str, str, str, Any]]) -> List[Dict[str, Any]]:
+    """Parse and scan a chunk of artifacts in a worker process"""
+    return _scan_inline(_worker_index, chunk)
+
+def _scan_inline(index: PolicyIndex, artifacts: List[Tuple[str, str, str, Any]]) -> List[Dict[str, Any]]:
+    """Parse and scan artifacts in the current process"""
+    findings = []
+    for artifact in artifacts:
+        for artifact_id, resource_type, document in parse_artifact(artifact):
+            findings.extend(index.scan(artifact_id, resource_type, document))
+    return findings
+
+def scan_artifacts(artifacts: List[Tuple[str, str, str, Any]], rules: List[PolicyRule],
+                   index: Optional[PolicyIndex] = None, max_workers: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Scan artifacts against the rules, in parallel processes for large batches
+
+    Parallel scans share one process pool per process. ``max_workers``
+    defaults to ``DEVOPS_AGENT_SCAN_WORKERS`` or the CPU count.
+    """
+    index = index or PolicyIndex(rules)
+    if len(artifacts) < PARALLEL_THRESHOLD:
+        return _scan_inline(index, artifacts)
+
+    workers = max_workers or int(os.environ.get("DEVOPS_AGENT_SCAN_WORKERS", "0")) or os.cpu_count() or 1
+    # A single worker process would only add startup and pickling costs
+    if workers == 1:
+        return _scan_inline(index, artifacts)
+
+    chunk_size = max(len(artifacts) // (workers * 4), MIN_CHUNK_SIZE)
+    chunks = [artifacts[i:i + chunk_size] for i in range(0, len(artifacts), chunk_size)]
+    if len(chunks) == 1:
+        return _scan_inline(index, artifacts)
+
+    findings = []
+    for chunk_findings in _get_pool(index, workers).map(_scan_chunk, chunks):
+        findings.extend(chunk_findings)
+    return findings
+
+def load_rules(policy_file: Optional[str] = None) -> List[PolicyRule]:
+    """
+    Load the default rules plus any rules from a JSON policy file
+    """
+    rules = [PolicyRule(**rule) for rule in DEFAULT_RULES]
+    if policy_file:
+        with open(policy_file) as f:
+            rules.extend(PolicyRule(**rule) for rule in json.load(f))
+    return rules
+
+_policy_cache: Dict[Optional[str], Tuple[List[PolicyRule], PolicyIndex]] = {}
+
+def get_policy(policy_file: Optional[str] = None) -> Tuple[List[PolicyRule], PolicyIndex]:
+    """
+    Return the rules and their index, built and serialized once per policy file
+    """
+    if policy_file not in _policy_cache:
+        rules = load_rules(policy_file)
+        _policy_cache[policy_file] = (rules, PolicyIndex(rules))
+    return _policy_cache[policy_file]
+
+def active_policy_file() -> Optional[str]:
+    """Return the policy file configured with DEVOPS_AGENT_POLICY_FILE"""
+    return os.environ.get("DEVOPS_AGENT_POLICY_FILE")
+
+def policy_digest() -> str:
+    """Return a digest of the active rule set, so a policy change forces a rescan"""
+    _, index = get_policy(active_policy_file())
+    return index.digest
+
+async def security_agent_node(state: DevOpsPlatformState) -> Dict[str, Any]:
+    """
+    Security agent that scans the CI/CD, Terraform and Kubernetes artifacts
+    generated earlier in the workflow against the policy rules
+    """
+    try:
+        rules, index = get_policy(active_policy_file())
+        artifacts = collect_artifacts(state)
+
+        logger.info("Security agent processing", artifacts=len(artifacts), rules=len(rules))
+
+        findings = await asyncio.to_thread(scan_artifacts, artifacts, rules, index)
+
+        summary: Dict[str, int] = {}
+        for finding in findings:
+            summary[finding["severity"]] = summary.get(finding["severity"], 0) + 1
+
+        # Store generated data
+        security_data = {
+            "findings": findings,
+            "summary": summary,
+            "artifacts_scanned": len(artifacts),
+            "rules": len(rules)
+        }
+
+        # Update state
+        state.completed_phases.append("security")
+        state.security_data = security_data
+
+        logger.info("Security scan completed", findings=len(findings), summary=summary)
+
+        return {
+            "security_data": security_data,
+            "message": f"Security scan of {len(artifacts)} artifacts found {len(findings)} issues"
+        }
+
+    except Exception as e:
+        logger.error("Security agent error", error=str(e))
+        state.errors.append({
+            "agent": "security",
+            "error": str(e),
+            "timestamp": datetime.now().isoformat()
+        })
+        return {"error": f"Error in security agent: {e}"}
@@ -15,6 +15,7 @@ setup(
         "openai>=1.0.0",
         "ollama>=0.1.0",
         "jinja2>=3.1.0",
+        "pyyaml>=6.0",
     ],
     entry_points={
         "console_scripts": [
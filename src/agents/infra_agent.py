@@ -7,9 +7,9 @@ import logging
 from typing import Dict, Any, List, Optional
 from pydantic import BaseModel
 from langchain_core.prompts import PromptTemplate
-from langchain_openai import ChatOpenAI
 from src.utils.terraform_generator import TerraformGenerator
 from src.utils.cloud_providers import CloudProvider
+from src.utils.model_router import ModelRouter
 from src.models.state import DevOpsState
 
 logger = logging.getLogger(__name__)
@@ -24,9 +24,10 @@ class InfraAgentInput(BaseModel):
 class InfraAgent:
     """Infrastructure agent that generates Terraform configurations"""
     
-    def __init__(self, llm_model: str = "gpt-4-turbo"):
-        self.llm = ChatOpenAI(model=llm_model, temperature=0.2)
-        self.terraform_generator = TerraformGenerator()
+    def __init__(self, llm_model: str = "gpt-4-turbo", llm: Optional[Any] = None,
+                 router: Optional[ModelRouter] = None):
+        self.terraform_generator = TerraformGenerator(llm_model, llm=llm, router=router)
+        self.router = self.terraform_generator.router
         
     async def generate_infra_config(self, state: DevOpsState) -> Dict[str, Any]:
         """Generate infrastructure configuration using Terraform"""
@@ -68,12 +69,15 @@ class InfraAgent:
             state.infra_data["generated"] = True
             
             logger.info("Infrastructure configuration generated successfully")
-            return {
+            result = {
                 "status": "success",
                 "terraform_config": terraform_config,
                 "cloud_provider": cloud_provider,
                 "region": region
             }
+            if self.router:
+                result["model_routing"] = self.router.stats()
+            return result
             
         except Exception as e:
             logger.error(f"Error generating infrastructure configuration: {str(e)}")
@@ -16,6 +16,9 @@ class DevOpsState(BaseModel):
     infra_data: Dict[str, Any] = {}
     app_data: Dict[str, Any] = {}
     deployment_data: Dict[str, Any] = {}
+    profile_data: Dict[str, Any] = {}
+    phase_fingerprints: Dict[str, Dict[str, Any]] = {}
+    phase_outputs: Dict[str, Dict[str, Any]] = {}
     timestamp: datetime = datetime.now()
     
     def add_error(self, agent: str, error: str):
@@ -4,85 +4,149 @@ Coordinates different agents in the platform
 """
 import asyncio
 import logging
-from typing import Dict, Any
+import uuid
+from typing import Dict, Any, List, Optional
 from src.agents.infra_agent import InfraAgent
 from src.agents.cicd_agent import CICDAgent
 from src.agents.app_agent import AppAgent
 from src.models.state import DevOpsState
+from src.utils.fingerprint import PhaseFingerprints
+from src.utils.profiler import WorkflowProfiler
 
 logger = logging.getLogger(__name__)
 
+# State paths each phase reads and writes, and the phases it builds on.
+# Specs are kept by hand against the agent code, so they only cover agents
+# in this tree; other phases run unless already completed on the state.
+PHASE_SPECS = {
+    "infra": {
+        "inputs": [
+            "user_request", "infra_data.cloud_provider", "infra_data.region",
+            "infra_data.resources", "infra_data.deploy"
+        ],
+        "outputs": [
+            "infra_data.terraform_config", "infra_data.cloud_provider", "infra_data.region",
+            "infra_data.generated", "infra_data.deployment_result"
+        ],
+        "upstream": []
+    }
+}
+
 class MainOrchestrator:
     """Main orchestrator that coordinates all agents"""
     
-    def __init__(self):
-        self.infra_agent = InfraAgent()
-        self.cicd_agent = CICDAgent()
-        self.app_agent = AppAgent()
+    def __init__(self, infra_agent: Optional[InfraAgent] = None,
+                 cicd_agent: Optional[CICDAgent] = None,
+                 app_agent: Optional[AppAgent] = None):
+        self.infra_agent = infra_agent or InfraAgent()
+        self.cicd_agent = cicd_agent or CICDAgent()
+        self.app_agent = app_agent or AppAgent()
+        self.fingerprints = PhaseFingerprints(PHASE_SPECS)
+        
+    async def execute_pipeline(self, state: DevOpsState, profile: bool = False,
+                               profile_dir: str = "profiles",
+                               previous_state: Optional[DevOpsState] = None) -> Dict[str, Any]:
+        """Execute the complete DevOps pipeline
         
-    async def execute_pipeline(self, state: DevOpsState) -> Dict[str, Any]:
-        """Execute the complete DevOps pipeline"""
+        Phases whose input fingerprints match a previous run (on this state
+        or on ``previous_state``) reuse their stored outputs instead of
+        running again.
+        
+        With ``profile=True`` this run's CPU profile, flamegraph stacks and
+        per-phase breakdown are written to ``profile_dir`` and returned
+        under ``"profile"``.
+        """
+        PhaseFingerprints.inherit(state, previous_state)
+        reused_phases: List[str] = []
+        profiler = WorkflowProfiler(f"pipeline-{uuid.uuid4().hex[:12]}", profile_dir, enabled=profile)
         try:
             logger.info("Starting DevOps pipeline execution")
+            profiler.start()
             
             # Execute infrastructure phase
-            if "infra" not in state.completed_phases:
-                logger.info("Executing infrastructure phase")
-                infra_result = await self.infra_agent.execute(state)
-                state.mark_phase_completed("infra")
-            else:
+            infra_result = await self._run_phase("infra", self.infra_agent, state, profiler, reused_phases)
+            if infra_result is None:
                 logger.info("Infrastructure phase already completed")
                 infra_result = {"status": "skipped", "message": "Infrastructure already configured"}
             
             # Execute application phase
-            if "app" not in state.completed_phases:
-                logger.info("Executing application phase")
-                app_result = await self.app_agent.execute(state)
-                state.mark_phase_completed("app")
-            else:
+            app_result = await self._run_phase("app", self.app_agent, state, profiler, reused_phases)
+            if app_result is None:
                 logger.info("Application phase already completed")
                 app_result = {"status": "skipped", "message": "Application already configured"}
             
             # Execute CI/CD phase
-            if "cicd" not in state.completed_phases:
-                logger.info("Executing CI/CD phase")
-                cicd_result = await self.cicd_agent.execute(state)
-                state.mark_phase_completed("cicd")
-            else:
+            cicd_result = await self._run_phase("cicd", self.cicd_agent, state, profiler, reused_phases)
+            if cicd_result is None:
                 logger.info("CI/CD phase already completed")
                 cicd_result = {"status": "skipped", "message": "CI/CD already configured"}
             
+            profiler.stop()
+            
             # Return combined results
-            return {
+            result = {
                 "status": "success",
                 "infra": infra_result,
                 "app": app_result,
                 "cicd": cicd_result,
-                "completed_phases": state.completed_phases
+                "completed_phases": state.completed_phases,
+                "reused_phases": reused_phases
             }
             
+            if profile:
+                state.profile_data = profiler.write()
+                result["profile"] = state.profile_data
+            
+            return result
+            
         except Exception as e:
+            profiler.stop()
             logger.error(f"Error in pipeline execution: {str(e)}")
             state.add_error("orchestrator", str(e))
             raise
     
+    async def _run_phase(self, phase: str, agent: Any, state: DevOpsState,
+                         profiler: WorkflowProfiler, reused_phases: List[str]) -> Optional[Dict[str, Any]]:
+        """Run a phase unless its stored outputs are still current
+        
+        Returns None for a phase completed without a recorded fingerprint.
+        """
+        if phase in PHASE_SPECS and self.fingerprints.is_current(phase, state):
+            reused_phases.append(phase)
+            state.mark_phase_completed(phase)
+            return self.fingerprints.restore(phase, state)
+        
+        if phase in state.completed_phases and phase not in state.phase_fingerprints:
+            return None
+        
+        if phase in state.phase_fingerprints:
+            changed = self.fingerprints.changed_inputs(phase, state)
+            logger.info(f"Inputs changed for {phase} phase: {', '.join(changed)}")
+        
+        logger.info(f"Executing {phase} phase")
+        fingerprint = self.fingerprints.compute(phase, state) if phase in PHASE_SPECS else None
+        with profiler.phase(phase):
+            result = await agent.execute(state)
+        if fingerprint is not None:
+            self.fingerprints.record(phase, state, fingerprint, result)
+        state.mark_phase_completed(phase)
+        return result
+    
     async def execute_phase(self, phase: str, state: DevOpsState) -> Dict[str, Any]:
         """Execute a specific phase of the pipeline"""
         try:
             logger.info(f"Executing {phase} phase")
             
-            if phase == "infra":
-                result = await self.infra_agent.execute(state)
-                state.mark_phase_completed("infra")
-            elif phase == "app":
-                result = await self.app_agent.execute(state)
-                state.mark_phase_completed("app")
-            elif phase == "cicd":
-                result = await self.cicd_agent.execute(state)
-                state.mark_phase_completed("cicd")
-            else:
+            agents = {"infra": self.infra_agent, "app": self.app_agent, "cicd": self.cicd_agent}
+            if phase not in agents:
                 raise ValueError(f"Unknown phase: {phase}")
             
+            fingerprint = self.fingerprints.compute(phase, state) if phase in PHASE_SPECS else None
+            result = await agents[phase].execute(state)
+            if fingerprint is not None:
+                self.fingerprints.record(phase, state, fingerprint, result)
+            state.mark_phase_completed(phase)
+            
             return {
                 "status": "success",
                 "phase": phase,
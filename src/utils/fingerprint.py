@@ -0,0 +1,171 @@
+"""
+Phase Fingerprints for DevOps Platform
+Records the inputs each phase consumed so reruns only recompute changed phases
+"""
+import copy
+import functools
+import hashlib
+import json
+import logging
+from typing import Dict, Any, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_MISSING = "<missing>"
+# Marks a result value stored at an output path rather than copied
+_OUTPUT_REF = "$output"
+
+def hash_value(value: Any) -> str:
+    """Stable hash of a JSON-like value"""
+    encoded = json.dumps(value, sort_keys=True, default=str).encode()
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+@functools.lru_cache(maxsize=1024)
+def _split_path(path: str) -> Tuple[str, ...]:
+    """Split a dotted path once; reusing the key strings keeps getattr from caching new ones"""
+    return tuple(path.split("."))
+
+def get_path(state: Any, path: str) -> Any:
+    """Read a dotted path such as ``infra_data.region`` from the state"""
+    value = state
+    for key in _split_path(path):
+        if isinstance(value, dict):
+            value = value.get(key, _MISSING)
+        else:
+            value = getattr(value, key, _MISSING)
+        if value is _MISSING or value is None:
+            return value
+    return value
+
+def set_path(state: Any, path: str, value: Any):
+    """Write a dotted path such as ``infra_data.terraform_config`` into the state"""
+    *parents, leaf = path.split(".")
+    target = state
+    for key in parents:
+        child = target.get(key) if isinstance(target, dict) else getattr(target, key, None)
+        if child is None:
+            child = {}
+            if isinstance(target, dict):
+                target[key] = child
+            else:
+                setattr(target, key, child)
+        target = child
+
+    if isinstance(target, dict):
+        target[leaf] = value
+    else:
+        setattr(target, leaf, value)
+
+class PhaseFingerprints:
+    """
+    Tracks per-phase input fingerprints and the outputs they produced.
+
+    Each phase spec lists the state paths it reads (``inputs``), the state
+    paths it writes (``outputs``) and the phases whose outputs it consumes
+    (``upstream``). ``digests`` optionally maps names to functions hashing
+    inputs kept outside the state, such as the active security policy.
+    Fingerprints live on the state in ``phase_fingerprints``
+    together with a digest of the outputs. The outputs themselves stay at
+    their state paths; ``phase_outputs`` only keeps the agent result with
+    outputs referenced by path, plus copies of a previous run's outputs
+    between ``inherit`` and ``restore``.
+    """
+
+    def __init__(self, specs: Dict[str, Dict[str, Any]]):
+        self.specs = specs
+
+    def compute(self, phase: str, state: Any) -> Dict[str, Any]:
+        """Fingerprint the current inputs of a phase"""
+        spec = self.specs[phase]
+        inputs = {path: hash_value(get_path(state, path)) for path in spec.get("inputs", [])}
+        for name, digest in spec.get("digests", {}).items():
+            inputs[name] = digest()
+        for upstream in spec.get("upstream", []):
+            stored = state.phase_fingerprints.get(upstream)
+            inputs[f"{upstream}:outputs"] = stored.get("outputs_digest", _MISSING) if stored else _MISSING
+
+        return {"digest": hash_value(inputs), "inputs": inputs}
+
+    def is_current(self, phase: str, state: Any) -> bool:
+        """Check whether stored outputs were produced from the current inputs"""
+        stored = state.phase_fingerprints.get(phase)
+        if not stored or phase not in state.phase_outputs:
+            return False
+        digest = self.compute(phase, state)["digest"]
+        if digest not in (stored["digest"], stored.get("post_digest")):
+            return False
+        # Outputs come from a previous run, or must still be intact in this state
+        return "outputs" in state.phase_outputs[phase] or _outputs_digest(state, stored["paths"]) == stored["outputs_digest"]
+
+    def changed_inputs(self, phase: str, state: Any) -> List[str]:
+        """List the inputs of a phase that changed since it was recorded"""
+        stored = state.phase_fingerprints.get(phase, {}).get("inputs", {})
+        current = self.compute(phase, state)["inputs"]
+        return sorted(path for path in current.keys() | stored.keys() if current.get(path) != stored.get(path))
+
+    def record(self, phase: str, state: Any, fingerprint: Dict[str, Any], result: Any):
+        """Record the pre-run fingerprint and output digest of a phase that just ran"""
+        paths = self.specs[phase].get("outputs", [])
+        state.phase_outputs[phase] = {"result": _result_skeleton(state, paths, result)}
+        # Agents may fill defaults into their own inputs; the post-run
+        # digest keeps a rerun on the same state from looking changed
+        state.phase_fingerprints[phase] = {
+            **fingerprint,
+            "post_digest": self.compute(phase, state)["digest"],
+            "paths": list(paths),
+            "outputs_digest": _outputs_digest(state, paths)
+        }
+
+    def restore(self, phase: str, state: Any) -> Any:
+        """Write inherited outputs back into the state and return the stored result"""
+        stored = state.phase_outputs[phase]
+        for path, value in stored.pop("outputs", {}).items():
+            if value != _MISSING:
+                set_path(state, path, value)
+
+        logger.info(f"Reusing stored outputs for {phase} phase")
+        return _rebuild_result(state, stored["result"])
+
+    @staticmethod
+    def inherit(state: Any, previous_state: Optional[Any]):
+        """Seed a fresh state with the fingerprints and outputs of a previous run"""
+        if previous_state is None:
+            return
+        for phase, fingerprint in previous_state.phase_fingerprints.items():
+            stored = previous_state.phase_outputs.get(phase)
+            if phase in state.phase_fingerprints or stored is None or "paths" not in fingerprint:
+                continue
+            outputs = stored.get("outputs") or {path: get_path(previous_state, path) for path in fingerprint["paths"]}
+            # Outputs overwritten after they were recorded cannot be reused
+            if hash_value(outputs) != fingerprint["outputs_digest"]:
+                continue
+            state.phase_fingerprints[phase] = copy.deepcopy(fingerprint)
+            state.phase_outputs[phase] = {
+                "result": copy.deepcopy(stored["result"]),
+                "outputs": copy.deepcopy(outputs)
+            }
+
+def _outputs_digest(state: Any, paths: List[str]) -> str:
+    """Hash the values at a phase's output paths"""
+    return hash_value({path: get_path(state, path) for path in paths})
+
+def _result_skeleton(state: Any, paths: List[str], result: Any) -> Any:
+    """Copy an agent result, replacing values shared with output paths by references"""
+    if not isinstance(result, dict):
+        return copy.deepcopy(result)
+    shared = {id(get_path(state, path)): path for path in paths}
+    return {
+        key: {_OUTPUT_REF: shared[id(value)]} if id(value) in shared and isinstance(value, (dict, list))
+        else copy.deepcopy(value)
+        for key, value in result.items()
+    }
+
+def _rebuild_result(state: Any, skeleton: Any) -> Any:
+    """Resolve output references in a stored result against the state"""
+    if not isinstance(skeleton, dict):
+        return copy.deepcopy(skeleton)
+    return {
+        key: get_path(state, value[_OUTPUT_REF]) if isinstance(value, dict) and _OUTPUT_REF in value
+        else copy.deepcopy(value)
+        for key, value in skeleton.items()
+    }
@@ -0,0 +1,105 @@
+"""
+Model Router for DevOps Platform
+Routes generation calls to a fast or a large model by request complexity
+"""
+import logging
+import statistics
+from typing import Dict, Any, Callable, List, Optional
+from langchain_openai import ChatOpenAI
+
+logger = logging.getLogger(__name__)
+
+# Extra complexity per provider; AWS prompts are the best covered
+PROVIDER_WEIGHTS = {
+    "aws": 0.0,
+    "azure": 1.0,
+    "gcp": 1.0
+}
+
+def default_llm_factory(model: str) -> Any:
+    """Create a chat model for a route"""
+    return ChatOpenAI(model=model, temperature=0.2)
+
+class ModelRouter:
+    """
+    Routes requests between a fast and a large model
+
+    Requests scoring at or below ``simple_threshold`` go to the fast model.
+    Callers escalate to the next route when the output fails validation,
+    and ``stats()`` reports per-route latency and the escalation rate for
+    tuning the threshold.
+    """
+
+    def __init__(self, fast_model: str = "gpt-4o-mini", large_model: str = "gpt-4-turbo",
+                 simple_threshold: float = 4.0,
+                 llm_factory: Callable[[str], Any] = default_llm_factory):
+        self.routes = {"fast": fast_model, "large": large_model}
+        self.escalation_order = ["fast", "large"]
+        self.simple_threshold = simple_threshold
+        self.llm_factory = llm_factory
+        self._llms: Dict[str, Any] = {}
+        self._latencies: Dict[str, List[float]] = {route: [] for route in self.routes}
+        self._escalations: Dict[str, int] = {route: 0 for route in self.routes}
+        self._requests = 0
+
+    def score(self, user_request: str, cloud_provider: str, resources: List[str]) -> float:
+        """Score request complexity from resource count, provider and request length"""
+        return (
+            len(resources)
+            + PROVIDER_WEIGHTS.get(cloud_provider.lower(), 2.0)
+            + len(user_request) / 200
+        )
+
+    def route(self, user_request: str, cloud_provider: str, resources: List[str]) -> str:
+        """Pick the route for a request"""
+        score = self.score(user_request, cloud_provider, resources)
+        route = "fast" if score <= self.simple_threshold else "large"
+        self._requests += 1
+        logger.info(f"Routing request with complexity {score:.2f} to {route} model {self.routes[route]}")
+        return route
+
+    def get_llm(self, route: str) -> Any:
+        """Return the model for a route, created on first use"""
+        if route not in self._llms:
+            self._llms[route] = self.llm_factory(self.routes[route])
+        return self._llms[route]
+
+    def escalation_for(self, route: str) -> Optional[str]:
+        """Return the route to retry on after a failed output, if any"""
+        position = self.escalation_order.index(route)
+        if position + 1 < len(self.escalation_order):
+            return self.escalation_order[position + 1]
+        return None
+
+    def record(self, route: str, latency: float, escalated: bool = False):
+        """Record the latency of a call and whether it was escalated"""
+        self._latencies[route].append(latency)
+        if escalated:
+            self._escalations[route] += 1
+            logger.warning(f"Escalating from {route} model {self.routes[route]} after failed validation")
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-route latency and escalation statistics"""
+        routes = {}
+        for route, latencies in self._latencies.items():
+            routes[route] = {
+                "model": self.routes[route],
+                "calls": len(latencies),
+                "escalations": self._escalations[route],
+                "avg_latency": statistics.fmean(latencies) if latencies else 0.0,
+                "p95_latency": _percentile(latencies, 0.95)
+            }
+
+        escalations = sum(self._escalations.values())
+        return {
+            "requests": self._requests,
+            "routes": routes,
+            "escalation_rate": escalations / self._requests if self._requests else 0.0
+        }
+
+def _percentile(values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)]
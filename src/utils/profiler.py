@@ -0,0 +1,215 @@
+"""
+Workflow Profiler for DevOps Platform
+Captures CPU profiles and async phase timelines for a single workflow run
+"""
+import asyncio
+import cProfile
+import json
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# cProfile hooks are per thread. Python 3.12 rejects a second enable() with
+# ValueError, but 3.11 silently replaces the active profiler, and the first
+# run's disable() then stops the second. Runs take this lock to profile, so
+# only one cProfile is active per process on any Python version.
+_CPU_PROFILER_LOCK = threading.Lock()
+
+class WorkflowProfiler:
+    """
+    Profiles one workflow run.
+
+    Produces three files in ``output_dir``:
+      - ``<run_id>.prof``: cProfile stats (snakeviz, pstats)
+      - ``<run_id>.folded``: collapsed stacks (flamegraph.pl, speedscope)
+      - ``<run_id>.phases.json``: per-phase breakdown and task timeline.
+        A phase's ``cpu_time`` is the thread's CPU time over the span, so
+        while the phase awaits it also counts other tasks on the loop.
+
+    A disabled profiler is a cheap no-op, so callers can wrap phases
+    unconditionally and enable profiling per request.
+
+    Concurrent runs on one event loop share a thread. Stack samples are only
+    kept while the task that called ``start`` is running, so work handed to
+    other tasks is not included. cProfile cannot be scoped to a task: the
+    first concurrent run holds it and records every task on the thread,
+    and later runs are only sampled.
+    """
+
+    def __init__(self, run_id: str, output_dir: str = "profiles",
+                 enabled: bool = True, sample_interval: float = 0.001):
+        self.run_id = run_id
+        self.output_dir = output_dir
+        self.enabled = enabled
+        self.sample_interval = sample_interval
+        self._cpu_profile: Optional[cProfile.Profile] = None
+        self._stacks: Counter = Counter()
+        self._timeline: List[Dict[str, Any]] = []
+        self._sampler: Optional[threading.Thread] = None
+        self._stop_sampling = threading.Event()
+        self._thread_id: Optional[int] = None
+        self._task_frame = None
+        self._started_at = 0.0
+        self._wall_time = 0.0
+
+    def start(self):
+        """Start CPU profiling and stack sampling for the calling thread"""
+        if not self.enabled:
+            return
+
+        self._thread_id = threading.get_ident()
+        self._started_at = time.perf_counter()
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            task = None
+        # Samples are attributed to the task by its outermost coroutine frame
+        self._task_frame = task.get_coro().cr_frame if task else None
+
+        self._cpu_profile = None
+        if _CPU_PROFILER_LOCK.acquire(blocking=False):
+            self._cpu_profile = cProfile.Profile()
+            try:
+                self._cpu_profile.enable()
+            except ValueError:
+                # On 3.12 an outside profiler, such as ``python -m cProfile``, is active
+                self._cpu_profile = None
+                _CPU_PROFILER_LOCK.release()
+        if self._cpu_profile is None:
+            logger.warning(f"CPU profiler busy, run {self.run_id} will only be sampled")
+
+        self._stop_sampling.clear()
+        self._sampler = threading.Thread(
+            target=self._sample_stacks,
+            name=f"profiler-{self.run_id}",
+            daemon=True
+        )
+        self._sampler.start()
+
+    def stop(self):
+        """Stop profiling"""
+        if not self.enabled or self._sampler is None:
+            return
+
+        if self._cpu_profile is not None:
+            self._cpu_profile.disable()
+            _CPU_PROFILER_LOCK.release()
+        self._stop_sampling.set()
+        self._sampler.join()
+        self._sampler = None
+        self._task_frame = None
+        self._wall_time = time.perf_counter() - self._started_at
+
+    @contextmanager
+    def phase(self, name: str):
+        """Record a phase span on the run timeline"""
+        if not self.enabled:
+            yield
+            return
+
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            task = None
+        start = time.perf_counter()
+        cpu_start = time.thread_time()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self._timeline.append({
+                "phase": name,
+                "task": task.get_name() if task else None,
+                "start": start - self._started_at,
+                "end": end - self._started_at,
+                "duration": end - start,
+                "cpu_time": time.thread_time() - cpu_start
+            })
+
+    def phase_breakdown(self) -> Dict[str, Dict[str, Any]]:
+        """Aggregate timeline spans per phase"""
+        breakdown: Dict[str, Dict[str, Any]] = {}
+        for span in self._timeline:
+            entry = breakdown.setdefault(span["phase"], {"calls": 0, "duration": 0.0, "cpu_time": 0.0})
+            entry["calls"] += 1
+            entry["duration"] += span["duration"]
+            entry["cpu_time"] += span["cpu_time"]
+
+        for entry in breakdown.values():
+            entry["share"] = entry["duration"] / self._wall_time if self._wall_time else 0.0
+        return breakdown
+
+    def write(self) -> Dict[str, Any]:
+        """Write profile outputs and return their paths with the phase breakdown"""
+        if not self.enabled:
+            return {}
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        base = os.path.join(self.output_dir, self.run_id)
+        outputs: Dict[str, Any] = {"run_id": self.run_id, "wall_time": self._wall_time}
+
+        top_functions = []
+        if self._cpu_profile is not None:
+            outputs["cpu_profile"] = f"{base}.prof"
+            self._cpu_profile.dump_stats(outputs["cpu_profile"])
+            top_functions = self._top_functions()
+
+        outputs["flamegraph"] = f"{base}.folded"
+        with open(outputs["flamegraph"], "w") as f:
+            for stack, count in self._stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+        outputs["phases"] = self.phase_breakdown()
+        outputs["phase_report"] = f"{base}.phases.json"
+        with open(outputs["phase_report"], "w") as f:
+            json.dump({
+                "run_id": self.run_id,
+                "wall_time": self._wall_time,
+                "phases": outputs["phases"],
+                "timeline": self._timeline,
+                "top_functions": top_functions
+            }, f, indent=2)
+
+        logger.info(f"Profile for run {self.run_id} written to {self.output_dir}")
+        return outputs
+
+    def _sample_stacks(self):
+        """Sample the profiled thread's stack until stopped"""
+        while not self._stop_sampling.wait(self.sample_interval):
+            frame = sys._current_frames().get(self._thread_id)
+            if frame is None:
+                continue
+
+            stack = []
+            in_task = self._task_frame is None
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                in_task = in_task or frame is self._task_frame
+                frame = frame.f_back
+            # Skip samples taken while another task on the thread was running
+            if in_task:
+                self._stacks[";".join(reversed(stack))] += 1
+
+    def _top_functions(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Summarize the most expensive functions by cumulative time"""
+        stats = pstats.Stats(self._cpu_profile)
+        ranked = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)
+
+        return [
+            {
+                "function": f"{os.path.basename(filename)}:{line}:{name}",
+                "calls": calls,
+                "total_time": total_time,
+                "cumulative_time": cumulative_time
+            }
+            for (filename, line, name), (_, calls, total_time, cumulative_time, _) in ranked[:limit]
+        ]
@@ -3,11 +3,16 @@ Terraform Generator for DevOps Platform
 Generates Terraform configurations for different cloud providers
 """
 import json
+import logging
 import re
+import time
 from typing import Dict, Any, List, Optional
 from pydantic import BaseModel
 from langchain_core.prompts import PromptTemplate
-from langchain_openai import ChatOpenAI
+from src.utils.model_router import ModelRouter
+from src.utils.terraform_templates import TerraformTemplates, DEFAULT_TEMPLATES
+
+logger = logging.getLogger(__name__)
 
 class TerraformResource(BaseModel):
     """Model for Terraform resource"""
@@ -18,11 +23,66 @@ class TerraformResource(BaseModel):
 class TerraformGenerator:
     """Generates Terraform configurations for different cloud providers"""
     
-    def __init__(self, llm_model: str = "gpt-4-turbo"):
-        self.llm = ChatOpenAI(model=llm_model, temperature=0.2)
+    def __init__(self, llm_model: str = "gpt-4-turbo", llm: Optional[Any] = None,
+                 router: Optional[ModelRouter] = None, templates: Optional[TerraformTemplates] = None):
+        # An explicit model disables routing; with a router, llm is None and
+        # the model is picked per request
+        self.llm = llm
+        self.router = router or (None if llm else ModelRouter(large_model=llm_model))
+        self.templates = templates or DEFAULT_TEMPLATES
         
     def generate(self, user_request: str, cloud_provider: str, region: str, resources: List[str]) -> Dict[str, Any]:
-        """Generate Terraform configuration based on user request"""
+        """Generate Terraform configuration based on user request
+        
+        Resources covered by the template library are rendered locally; only
+        the rest are sent to the LLM.
+        """
+        covered, uncovered = self.templates.split(cloud_provider, region, resources)
+        if not covered:
+            return self._generate_llm(user_request, cloud_provider, region, resources)
+        
+        terraform_config = self.templates.render(cloud_provider, region, covered)
+        if not uncovered:
+            logger.info(f"Rendered {len(covered)} resources from templates")
+            return terraform_config
+        
+        logger.info(f"Rendered {len(covered)} resources from templates, generating {len(uncovered)} with LLM")
+        existing = [f"{resource['type']}.{resource['name']}" for resource in terraform_config["resources"]]
+        llm_config = self._generate_llm(user_request, cloud_provider, region, uncovered, existing)
+        return self._merge(terraform_config, llm_config)
+    
+    def _generate_llm(self, user_request: str, cloud_provider: str, region: str,
+                      resources: List[str], existing: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Generate Terraform configuration with the LLM
+        
+        With a router, simple requests go to the fast model and are retried
+        on the next model when the output fails validation.
+        """
+        if self.router is None:
+            return self._generate_with(self.llm, user_request, cloud_provider, region, resources, existing)
+        
+        route = self.router.route(user_request, cloud_provider, resources)
+        while True:
+            start = time.perf_counter()
+            terraform_config = self._generate_with(
+                self.router.get_llm(route), user_request, cloud_provider, region, resources, existing
+            )
+            next_route = None
+            if not self.validate(terraform_config)["valid"]:
+                next_route = self.router.escalation_for(route)
+            self.router.record(route, time.perf_counter() - start, escalated=next_route is not None)
+            
+            if next_route is None:
+                return terraform_config
+            route = next_route
+    
+    def _generate_with(self, llm: Any, user_request: str, cloud_provider: str, region: str,
+                       resources: List[str], existing: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Generate Terraform configuration with a specific model
+        
+        ``existing`` lists addresses of resources already defined elsewhere,
+        which the generated code should reference rather than redefine.
+        """
         try:
             # Create a prompt for the LLM to generate Terraform code
             prompt_template = """
@@ -30,7 +90,7 @@ class TerraformGenerator:
             User request: "{user_request}"
             
             Resources to include: {resources}
-            
+            {existing}
             Please generate valid Terraform HCL code with proper structure.
             Include all necessary providers, resources, and outputs.
             """
@@ -38,12 +98,16 @@ class TerraformGenerator:
             prompt = PromptTemplate.from_template(prompt_template)
             
             # Get the LLM response
-            response = self.llm.invoke(
+            response = llm.invoke(
                 prompt.format(
                     cloud_provider=cloud_provider,
                     region=region,
                     user_request=user_request,
-                    resources=", ".join(resources)
+                    resources=", ".join(resources),
+                    existing=(
+                        f"Already defined, reference these and do not redefine them: {', '.join(existing)}\n"
+                        if existing else ""
+                    )
                 )
             )
             
@@ -58,6 +122,26 @@ class TerraformGenerator:
         except Exception as e:
             raise ValueError(f"Error generating Terraform configuration: {str(e)}")
     
+    def _merge(self, terraform_config: Dict[str, Any], llm_config: Dict[str, Any]) -> Dict[str, Any]:
+        """Add LLM-generated resources and outputs to the templated configuration
+        
+        LLM resources redefining a templated address, which the prompt listed
+        as already defined, are dropped; other resources of a templated type
+        are kept.
+        """
+        templated = {f"{resource['type']}.{resource['name']}" for resource in terraform_config["resources"]}
+        output_names = {output["name"] for output in terraform_config["outputs"]}
+        terraform_config["resources"] += [
+            resource for resource in llm_config.get("resources", [])
+            if f"{resource['type']}.{resource['name']}" not in templated
+        ]
+        terraform_config["outputs"] += [
+            output for output in llm_config.get("outputs", []) if output["name"] not in output_names
+        ]
+        terraform_config["variables"] += llm_config.get("variables", [])
+        terraform_config["source"] = "template+llm"
+        return terraform_config
+    
     def _parse_terraform_code(self, terraform_code: str) -> Dict[str, Any]:
         """Parse Terraform code into structured format"""
         # This is a simplified parser - in a real implementation, 
@@ -0,0 +1,230 @@
+"""
+Terraform Templates for DevOps Platform
+Renders common resource sets locally from parameterized per-provider templates
+"""
+import ipaddress
+import logging
+from typing import Dict, Any, List, Optional, Tuple
+import jinja2
+from src.utils.cloud_providers import CloudProvider, CloudProviderConfig
+
+logger = logging.getLogger(__name__)
+
+# Spellings of the resource kinds the templates cover
+RESOURCE_ALIASES = {
+    "vpc": "vpc",
+    "network": "vpc",
+    "vnet": "vpc",
+    "virtual_network": "vpc",
+    "subnet": "subnet",
+    "subnetwork": "subnet",
+    "security_group": "security_group",
+    "sg": "security_group",
+    "firewall": "security_group",
+    "network_security_group": "security_group",
+    "nsg": "security_group"
+}
+
+# Resource templates per provider: kind -> (type, name, body, required kinds)
+TEMPLATE_SOURCES = {
+    CloudProvider.AWS: {
+        "vpc": ("aws_vpc", "main", """\
+cidr_block           = "{{ vpc_cidr }}"
+enable_dns_support   = true
+enable_dns_hostnames = true
+
+tags = {
+  Name = "main"
+}""", []),
+        "subnet": ("aws_subnet", "main", """\
+vpc_id            = aws_vpc.main.id
+cidr_block        = "{{ subnet_cidr }}"
+availability_zone = "{{ region }}a"
+
+tags = {
+  Name = "main"
+}""", ["vpc"]),
+        "security_group": ("aws_security_group", "main", """\
+name   = "main"
+vpc_id = aws_vpc.main.id
+
+ingress {
+  from_port   = 443
+  to_port     = 443
+  protocol    = "tcp"
+  cidr_blocks = ["{{ vpc_cidr }}"]
+}
+
+egress {
+  from_port   = 0
+  to_port     = 0
+  protocol    = "-1"
+  cidr_blocks = ["0.0.0.0/0"]
+}""", ["vpc"])
+    },
+    CloudProvider.AZURE: {
+        "resource_group": ("azurerm_resource_group", "main", """\
+name     = "main-rg"
+location = "{{ region }}\"""", []),
+        "vpc": ("azurerm_virtual_network", "main", """\
+name                = "main-vnet"
+address_space       = ["{{ vpc_cidr }}"]
+location            = azurerm_resource_group.main.location
+resource_group_name = azurerm_resource_group.main.name""", ["resource_group"]),
+        "subnet": ("azurerm_subnet", "main", """\
+name                 = "main-subnet"
+resource_group_name  = azurerm_resource_group.main.name
+virtual_network_name = azurerm_virtual_network.main.name
+address_prefixes     = ["{{ subnet_cidr }}"]""", ["vpc"]),
+        "security_group": ("azurerm_network_security_group", "main", """\
+name                = "main-nsg"
+location            = azurerm_resource_group.main.location
+resource_group_name = azurerm_resource_group.main.name
+
+security_rule {
+  name                       = "allow-https"
+  priority                   = 100
+  direction                  = "Inbound"
+  access                     = "Allow"
+  protocol                   = "Tcp"
+  source_port_range          = "*"
+  destination_port_range     = "443"
+  source_address_prefix      = "{{ vpc_cidr }}"
+  destination_address_prefix = "*"
+}""", ["resource_group"])
+    },
+    CloudProvider.GCP: {
+        "vpc": ("google_compute_network", "main", """\
+name                    = "main"
+auto_create_subnetworks = false""", []),
+        "subnet": ("google_compute_subnetwork", "main", """\
+name          = "main"
+region        = "{{ region }}"
+network       = google_compute_network.main.id
+ip_cidr_range = "{{ subnet_cidr }}\"""", ["vpc"]),
+        "security_group": ("google_compute_firewall", "main", """\
+name    = "main-allow-https"
+network = google_compute_network.main.name
+
+allow {
+  protocol = "tcp"
+  ports    = ["443"]
+}
+
+source_ranges = ["{{ vpc_cidr }}"]""", ["vpc"])
+    }
+}
+
+PROVIDER_TEMPLATES = {
+    CloudProvider.AWS: 'region = "{{ region }}"',
+    CloudProvider.AZURE: "features {}",
+    CloudProvider.GCP: 'region = "{{ region }}"'
+}
+
+# Templates are compiled once and shared by every request
+_ENVIRONMENT = jinja2.Environment(undefined=jinja2.StrictUndefined)
+
+class TerraformTemplates:
+    """
+    Library of precompiled Terraform templates per provider
+
+    Requests whose resources are all covered render locally; ``split``
+    separates the resources that still need the LLM.
+    """
+
+    def __init__(self):
+        self.resources: Dict[CloudProvider, Dict[str, Tuple[str, str, Any, List[str]]]] = {}
+        self.providers: Dict[CloudProvider, Any] = {}
+        self.params: Dict[CloudProvider, Dict[str, Any]] = {}
+
+        for provider, sources in TEMPLATE_SOURCES.items():
+            self.resources[provider] = {
+                kind: (resource_type, name, _ENVIRONMENT.from_string(body), requires)
+                for kind, (resource_type, name, body, requires) in sources.items()
+            }
+            self.providers[provider] = _ENVIRONMENT.from_string(PROVIDER_TEMPLATES[provider])
+
+            config = CloudProviderConfig.get_provider_config(provider)
+            network = ipaddress.ip_network(config["default_vpc_cidr"])
+            self.params[provider] = {
+                "provider_block": config["provider_block"],
+                "supported_regions": set(config["supported_regions"]),
+                "vpc_cidr": str(network),
+                # First /24 of the network, or the network itself if smaller
+                "subnet_cidr": str(next(network.subnets(new_prefix=max(24, network.prefixlen))))
+            }
+
+    def split(self, cloud_provider: str, region: str,
+              resources: List[str]) -> Tuple[List[str], List[str]]:
+        """Split resources into those the templates cover and those they don't"""
+        provider = _parse_provider(cloud_provider)
+        if provider is None or region not in self.params[provider]["supported_regions"]:
+            return [], list(resources)
+
+        covered, uncovered = [], []
+        for resource in resources:
+            kind = RESOURCE_ALIASES.get(_normalize(resource))
+            (covered if kind else uncovered).append(resource)
+        return covered, uncovered
+
+    def covers(self, cloud_provider: str, region: str, resources: List[str]) -> bool:
+        """Check whether every requested resource can be rendered locally"""
+        covered, uncovered = self.split(cloud_provider, region, resources)
+        return bool(covered) and not uncovered
+
+    def render(self, cloud_provider: str, region: str, resources: List[str]) -> Dict[str, Any]:
+        """
+        Render covered resources, plus the resources they depend on, into
+        the structured format produced by TerraformGenerator
+        """
+        provider = _parse_provider(cloud_provider)
+        if provider is None:
+            raise ValueError(f"No Terraform templates for provider: {cloud_provider}")
+
+        templates = self.resources[provider]
+        params = {**self.params[provider], "region": region}
+
+        kinds: List[str] = []
+        def add(kind: str):
+            if kind in kinds:
+                return
+            for required in templates[kind][3]:
+                add(required)
+            kinds.append(kind)
+
+        for resource in resources:
+            kind = RESOURCE_ALIASES.get(_normalize(resource))
+            if kind is None:
+                raise ValueError(f"No Terraform template for resource: {resource}")
+            add(kind)
+
+        rendered = []
+        for kind in kinds:
+            resource_type, name, template, _ = templates[kind]
+            rendered.append({"type": resource_type, "name": name, "body": template.render(params)})
+
+        return {
+            "provider": params["provider_block"],
+            "provider_config": self.providers[provider].render(params),
+            "resources": rendered,
+            "outputs": [
+                {"name": f"{resource['type']}_id", "body": f"value = {resource['type']}.{resource['name']}.id"}
+                for resource in rendered
+            ],
+            "variables": [],
+            "source": "template"
+        }
+
+def _parse_provider(cloud_provider: str) -> Optional[CloudProvider]:
+    """Map a provider name to a CloudProvider, if supported"""
+    try:
+        return CloudProvider(cloud_provider.lower())
+    except ValueError:
+        return None
+
+def _normalize(resource: str) -> str:
+    """Normalize a resource name such as 'Security Group' to 'security_group'"""
+    return resource.strip().lower().replace("-", "_").replace(" ", "_")
+
+# Shared library compiled at import
+DEFAULT_TEMPLATES = TerraformTemplates()
@@ -0,0 +1,59 @@
+"""
+Shared test configuration
+"""
+import importlib
+import sys
+import types
+import pytest
+
+class StubResponse:
+    """Chat response carrying fixed content"""
+
+    def __init__(self, content: str):
+        self.content = content
+
+class StubLLM:
+    """
+    LLM stand-in that answers every prompt with fixed content
+
+    Only the call count and last prompt are kept, so the memory suite can
+    run thousands of calls through it.
+    """
+
+    def __init__(self, content: str = ""):
+        self.content = content
+        self.calls = 0
+        self.last_prompt = None
+
+    def invoke(self, prompt):
+        self.calls += 1
+        self.last_prompt = prompt
+        return StubResponse(self.content)
+
+class StubPhaseAgent:
+    """Agent stand-in for orchestrator phases without an LLM dependency"""
+
+    field = ""
+
+    async def execute(self, state):
+        getattr(state, self.field)["generated"] = True
+        return {"status": "success"}
+
+@pytest.fixture
+def stub_llm():
+    """Factory for LLM stand-ins answering with fixed content"""
+    return StubLLM
+
+@pytest.fixture
+def orchestrator_module(monkeypatch):
+    """
+    Import src.orchestrator.main_orchestrator with stand-ins for the CI/CD
+    and app agents the tree does not provide
+    """
+    for name, class_name, field in (("src.agents.cicd_agent", "CICDAgent", "cicd_data"),
+                                    ("src.agents.app_agent", "AppAgent", "app_data")):
+        module = types.ModuleType(name)
+        setattr(module, class_name, type(class_name, (StubPhaseAgent,), {"field": field}))
+        monkeypatch.setitem(sys.modules, name, module)
+    monkeypatch.delitem(sys.modules, "src.orchestrator.main_orchestrator", raising=False)
+    return importlib.import_module("src.orchestrator.main_orchestrator")
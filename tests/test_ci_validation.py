@@ -0,0 +1,83 @@
+"""
+Test cases for CI pipeline validation
+"""
+import pytest
+from devops_platform_agent import ci_validation
+from devops_platform_agent.ci_validation import CIValidator
+from devops_platform_agent.cicd_agent import cicd_agent_node
+from devops_platform_agent.models import DevOpsPlatformState
+from devops_platform_agent.pipeline_ir import build_pipeline, emit
+
+def test_generated_pipelines_are_valid():
+    """Test every emitted pipeline passes its schema"""
+    validator = CIValidator()
+    for request in ["Create Node.js application", "Create Python application", "Create Java service"]:
+        files = emit(build_pipeline(request), ["gitlab", "github", "jenkins"])
+        assert validator.validate_files(files) == {}
+
+def test_invalid_pipelines_report_errors():
+    """Test malformed YAML, schema violations and dangling references are reported"""
+    validator = CIValidator()
+
+    assert validator.validate(".gitlab-ci.yml", "stages: [build\n")[0].startswith("invalid YAML")
+    assert validator.validate(".gitlab-ci.yml", "build_job:\n  stage: build\n") == [
+        "build_job: missing required key 'script'"
+    ]
+    assert validator.validate(".gitlab-ci.yml", "stages: [build]\nlint:\n  stage: lint\n  script: [make lint]\n") == [
+        "lint.stage: stage 'lint' is not declared in stages"
+    ]
+    assert validator.validate(
+        ".github/workflows/ci.yml",
+        "on: push\njobs:\n  test:\n    runs-on: ubuntu-latest\n    needs: build\n    steps:\n      - run: make\n"
+    ) == ["jobs.test.needs: unknown job 'build'"]
+
+def test_unusual_yaml_keys_report_errors():
+    """Test non-string job names and dependencies are reported instead of raising"""
+    validator = CIValidator()
+
+    assert validator.validate(".gitlab-ci.yml", "stages: [build]\n1:\n  stage: build\n  script: [x]\n") == []
+    assert validator.validate(
+        ".github/workflows/ci.yml",
+        "on: push\njobs:\n  test:\n    runs-on: ubuntu-latest\n    needs: [[b]]\n    steps:\n      - run: make\n"
+    ) == ["jobs.test.needs[0]: expected string, got list"]
+
+def test_invalid_jenkinsfiles_report_errors():
+    """Test Jenkinsfiles are checked for balanced blocks, an agent and stage steps"""
+    validator = CIValidator()
+
+    assert validator.validate("Jenkinsfile", "pipeline {\n  agent any\n  stages {\n") == [
+        "pipeline.stages: block is not closed"
+    ]
+    assert validator.validate("Jenkinsfile", "pipeline {\n  agent any\n  steps { sh 'make }\n}\n") == [
+        "line 3: unterminated string"
+    ]
+    assert validator.validate("Jenkinsfile", "pipeline {\n  stages {\n    stage('build') {\n      when { branch 'main' }\n    }\n  }\n}\n") == [
+        "pipeline: missing agent",
+        "pipeline.stages.stage('build'): missing steps"
+    ]
+
+def test_identical_files_are_validated_once():
+    """Test results are cached by content hash"""
+    validator = CIValidator()
+    files = emit(build_pipeline("Create Python application"), ["gitlab", "github"])
+
+    for _ in range(100):
+        validator.validate_files(files)
+
+    assert validator.misses == 2
+    assert validator.hits == 198
+
+@pytest.mark.asyncio
+async def test_cicd_agent_rejects_invalid_pipeline(monkeypatch):
+    """Test the CI/CD agent fails when a generated file does not validate"""
+    monkeypatch.setattr("devops_platform_agent.cicd_agent.emit",
+                        lambda pipeline, targets: {".gitlab-ci.yml": "build_job:\n  stage: build\n"})
+    state = DevOpsPlatformState(user_request="Create Python application")
+
+    result = await cicd_agent_node(state)
+
+    assert "failed validation" in result["error"]
+    assert state.errors[0]["agent"] == "cicd"
+
+    monkeypatch.setattr(ci_validation, "VALIDATION_ENABLED", False)
+    assert "cicd_data" in await cicd_agent_node(DevOpsPlatformState(user_request="Create Python application"))
@@ -23,4 +23,31 @@ async def test_cicd_agent_python():
     
     assert "cicd_data" in result
     assert "python-app" in result["cicd_data"]["project_name"]
-    assert "python:3.11" in result["cicd_data"]["build_image"]
\ No newline at end of file
+    assert "python:3.11" in result["cicd_data"]["build_image"]
+
+@pytest.mark.asyncio
+async def test_cicd_agent_emits_all_targets():
+    """Test CI/CD agent emits GitLab CI, GitHub Actions and Jenkins from one pipeline"""
+    yaml = pytest.importorskip("yaml")
+    state = DevOpsPlatformState(
+        user_request="Create Java application",
+        ci_targets=["gitlab", "github", "jenkins"]
+    )
+    result = await cicd_agent_node(state)
+    
+    cicd_data = result["cicd_data"]
+    gitlab = yaml.safe_load(cicd_data[".gitlab-ci.yml"])
+    github = yaml.safe_load(cicd_data[".github/workflows/ci.yml"])
+    assert "mvn -B test" in gitlab["test_job"]["script"]
+    assert gitlab["default"]["cache"]["key"]["files"] == ["pom.xml"]
+    assert github["jobs"]["test"]["needs"] == "build"
+    assert "actions/cache@v4" in [step.get("uses") for step in github["jobs"]["build"]["steps"]]
+    assert "-Dmaven.repo.local=/ci-cache/.m2/repository" in cicd_data["Jenkinsfile"]
+
+@pytest.mark.asyncio
+async def test_cicd_agent_unknown_target():
+    """Test CI/CD agent reports unknown CI targets"""
+    state = DevOpsPlatformState(user_request="Create Python application", ci_targets=["travis"])
+    result = await cicd_agent_node(state)
+    
+    assert "error" in result
@@ -0,0 +1,108 @@
+"""
+Test cases for the Kubernetes agent
+"""
+import os
+import time
+import pytest
+from devops_platform_agent.k8s_agent import k8s_agent_node, build_workloads, iter_manifests
+from devops_platform_agent.main import run_devops_workflow
+from devops_platform_agent.models import DevOpsPlatformState
+
+@pytest.mark.asyncio
+async def test_k8s_agent_renders_all_kinds():
+    """Test Kubernetes agent renders Deployment, Service, HPA and ConfigMap per service"""
+    yaml = pytest.importorskip("yaml")
+    state = DevOpsPlatformState(
+        user_request="Deploy services",
+        services=[{"name": "api", "image": "registry.local/api:1.2", "config": {"LOG_LEVEL": "debug"}}]
+    )
+    result = await k8s_agent_node(state)
+    
+    manifests = result["k8s_data"]["manifests"]
+    kinds = {yaml.safe_load(document)["kind"] for document in manifests.values()}
+    assert kinds == {"Deployment", "Service", "HorizontalPodAutoscaler", "ConfigMap"}
+    
+    configmap = yaml.safe_load(manifests["k8s/api/configmap.yaml"])
+    assert configmap["data"] == {"LOG_LEVEL": "debug"}
+    assert "k8s" in state.completed_phases
+
+@pytest.mark.asyncio
+async def test_k8s_agent_defaults_to_cicd_project():
+    """Test Kubernetes agent falls back to the CI/CD project when no services are given"""
+    state = DevOpsPlatformState(user_request="Deploy app", cicd_data={"project_name": "python-app"})
+    result = await k8s_agent_node(state)
+    
+    assert result["k8s_data"]["services"] == ["python-app"]
+
+@pytest.mark.asyncio
+async def test_k8s_agent_streams_manifests_to_directory(tmp_path):
+    """Test manifests are written to the manifest directory and only their paths are kept"""
+    state = DevOpsPlatformState(
+        user_request="Deploy services",
+        services=[{"name": "api"}, {"name": "web"}],
+        manifest_dir=str(tmp_path)
+    )
+    result = await k8s_agent_node(state)
+    
+    k8s_data = result["k8s_data"]
+    assert "manifests" not in k8s_data
+    assert len(k8s_data["manifest_paths"]) == 8
+    assert all(os.path.isfile(tmp_path / path) for path in k8s_data["manifest_paths"])
+    assert "kind: Deployment" in (tmp_path / "k8s/api/deployment.yaml").read_text()
+
+@pytest.mark.asyncio
+async def test_streamed_manifests_are_scanned(tmp_path):
+    """Test the security agent scans manifests streamed to disk"""
+    state = await run_devops_workflow("Create Python application", manifest_dir=str(tmp_path))
+    
+    assert state.k8s_data["manifest_paths"]
+    assert state.security_data["artifacts_scanned"] == 5
+
+@pytest.mark.asyncio
+async def test_k8s_agent_rejects_invalid_service_name():
+    """Test Kubernetes agent reports invalid service names"""
+    state = DevOpsPlatformState(user_request="Deploy app", services=[{"name": "Bad_Name"}])
+    result = await k8s_agent_node(state)
+    
+    assert "error" in result
+
+def test_k8s_agent_rejects_unpinned_image():
+    """Test images must be pinned to a tag other than latest"""
+    with pytest.raises(ValueError):
+        build_workloads([{"name": "api", "image": "api:latest"}])
+    with pytest.raises(ValueError):
+        build_workloads([{"name": "api", "image": "registry.local:5000/api"}])
+    
+    assert build_workloads([{"name": "api"}])[0]["image"] == "api:0.1.0"
+
+@pytest.mark.parametrize("field, value", [
+    ("namespace", "x\n  evil: 1"),
+    ("replicas", "3\nfoo: bar"),
+    ("port", 70000),
+    ("max_replicas", True),
+    ("min_replicas", 20),
+    ("cpu_limit", "500m\nfoo: bar"),
+    ("memory_request", "lots")
+])
+def test_k8s_agent_rejects_invalid_service_fields(field, value):
+    """Test every templated service field is validated before rendering"""
+    with pytest.raises(ValueError, match=field):
+        build_workloads([{"name": "api", field: value}])
+
+def test_k8s_agent_accepts_resource_quantities():
+    """Test valid CPU and memory quantities are rendered"""
+    workload = build_workloads([{"name": "api", "cpu_limit": 1, "cpu_request": "0.25", "memory_limit": "1Gi"}])[0]
+    
+    deployment = dict(iter_manifests([workload]))["k8s/api/deployment.yaml"]
+    assert "cpu: 1\n" in deployment and "cpu: 0.25\n" in deployment
+
+def test_k8s_agent_renders_thousand_services_quickly():
+    """Test 1,000 services render in well under a second"""
+    services = [{"name": f"service-{i}", "config": {"INDEX": i}} for i in range(1000)]
+    
+    start = time.perf_counter()
+    manifests = list(iter_manifests(build_workloads(services)))
+    elapsed = time.perf_counter() - start
+    
+    assert len(manifests) == 4000
+    assert elapsed < 0.5
@@ -0,0 +1,159 @@
+"""
+Memory-footprint regression suite for large workflow batches
+
+Runs batches of workflows under tracemalloc and compares peak and retained
+bytes per workflow against the budgets in memory_budget.json. A default
+run measures 200 workflows; DEVOPS_AGENT_RUN_SLOW=1 runs the full batch of
+a thousand. Set DEVOPS_AGENT_UPDATE_MEMORY_BUDGET=1 to rewrite the budgets
+from a run, and DEVOPS_AGENT_MEMORY_WORKFLOWS to change the batch size.
+"""
+import gc
+import json
+import os
+import tracemalloc
+import warnings
+import pytest
+from devops_platform_agent.main import run_devops_workflow
+
+BUDGET_FILE = os.path.join(os.path.dirname(__file__), "memory_budget.json")
+RUN_FULL_BATCH = os.environ.get("DEVOPS_AGENT_RUN_SLOW") == "1"
+WORKFLOW_COUNT = int(os.environ.get("DEVOPS_AGENT_MEMORY_WORKFLOWS", "1000" if RUN_FULL_BATCH else "200"))
+UPDATE_BUDGET = os.environ.get("DEVOPS_AGENT_UPDATE_MEMORY_BUDGET") == "1"
+BUDGET_HEADROOM = 1.25
+# Noise allowed in retained bytes once bounded caches have settled
+RETAINED_BYTES_FLOOR = 64
+WARMUP_COUNT = 20
+SETTLE_COUNT = 500 if RUN_FULL_BATCH else 100
+TOP_SITES = 10
+
+STUB_TERRAFORM = """
+resource "aws_vpc" "main" {
+  cidr_block = "10.0.0.0/16"
+}
+
+resource "aws_subnet" "main" {
+  vpc_id     = aws_vpc.main.id
+  cidr_block = "10.0.1.0/24"
+}
+
+output "vpc_id" {
+  value = aws_vpc.main.id
+}
+"""
+
+async def measure_workflows(run_workflow, count: int):
+    """Measure peak and retained bytes per workflow and the top allocation sites"""
+    for _ in range(WARMUP_COUNT):
+        await run_workflow()
+    gc.collect()
+
+    # Warnings recorded by the test runner would otherwise count as retained
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return await _trace_workflows(run_workflow, count)
+
+async def _trace_workflows(run_workflow, count: int):
+    """
+    Run workflows under tracemalloc
+
+    A first batch of SETTLE_COUNT workflows lets one-off allocations and
+    bounded caches fill; retained bytes are the growth over the measured
+    batch only, so they are per-workflow growth at any batch size.
+    """
+    tracemalloc.start()
+    try:
+        peak_per_workflow = await _run_batch(run_workflow, SETTLE_COUNT)
+        gc.collect()
+        baseline = tracemalloc.take_snapshot()
+        baseline_bytes, _ = tracemalloc.get_traced_memory()
+
+        peak_per_workflow = max(peak_per_workflow, await _run_batch(run_workflow, count))
+        gc.collect()
+        retained_bytes, _ = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+
+    filters = [
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap*>")
+    ]
+    top_sites = snapshot.filter_traces(filters).compare_to(baseline.filter_traces(filters), "lineno")
+
+    return {
+        "workflows": count,
+        "peak_bytes_per_workflow": peak_per_workflow,
+        "retained_bytes_per_workflow": max(retained_bytes - baseline_bytes, 0) / count,
+        "top_sites": [str(stat) for stat in top_sites[:TOP_SITES]]
+    }
+
+async def _run_batch(run_workflow, count: int) -> int:
+    """Run a batch of workflows and return the highest peak of a single one"""
+    peak_per_workflow = 0
+    for _ in range(count):
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        await run_workflow()
+        _, peak = tracemalloc.get_traced_memory()
+        peak_per_workflow = max(peak_per_workflow, peak - before)
+    return peak_per_workflow
+
+def check_budget(name: str, measured):
+    """Report measurements and fail when a stored budget is exceeded"""
+    with open(BUDGET_FILE) as f:
+        budgets = json.load(f)
+
+    report = "\n".join([
+        f"{name}: {measured['workflows']} workflows",
+        f"  peak bytes per workflow:     {measured['peak_bytes_per_workflow']:.0f}",
+        f"  retained bytes per workflow: {measured['retained_bytes_per_workflow']:.1f}",
+        "  top allocation sites:",
+        *(f"    {site}" for site in measured["top_sites"])
+    ])
+    print(report)
+
+    if UPDATE_BUDGET:
+        budgets[name] = {
+            "peak_bytes_per_workflow": int(measured["peak_bytes_per_workflow"] * BUDGET_HEADROOM),
+            "retained_bytes_per_workflow": max(
+                int(measured["retained_bytes_per_workflow"] * BUDGET_HEADROOM),
+                RETAINED_BYTES_FLOOR
+            )
+        }
+        with open(BUDGET_FILE, "w") as f:
+            json.dump(budgets, f, indent=2)
+            f.write("\n")
+        return
+
+    budget = budgets[name]
+    for metric in ("peak_bytes_per_workflow", "retained_bytes_per_workflow"):
+        assert measured[metric] <= budget[metric], (
+            f"{metric} {measured[metric]:.0f} exceeds budget {budget[metric]}\n{report}"
+        )
+
+@pytest.mark.asyncio
+async def test_run_devops_workflow_memory_budget():
+    """Test run_devops_workflow stays within its per-workflow memory budget"""
+    async def run_workflow():
+        await run_devops_workflow("Create Python application with CI/CD pipeline")
+
+    measured = await measure_workflows(run_workflow, WORKFLOW_COUNT)
+    check_budget("run_devops_workflow", measured)
+
+@pytest.mark.asyncio
+async def test_main_orchestrator_memory_budget(orchestrator_module, stub_llm):
+    """Test MainOrchestrator.execute_pipeline stays within its per-workflow memory budget"""
+    from src.agents.infra_agent import InfraAgent
+    from src.models.state import DevOpsState
+
+    orchestrator = orchestrator_module.MainOrchestrator(infra_agent=InfraAgent(llm=stub_llm(STUB_TERRAFORM)))
+
+    async def run_workflow():
+        state = DevOpsState(
+            user_request="Deploy a web application with CI/CD pipeline",
+            infra_data={"cloud_provider": "aws", "region": "us-east-1", "resources": ["vpc", "subnet"]}
+        )
+        await orchestrator.execute_pipeline(state)
+
+    measured = await measure_workflows(run_workflow, WORKFLOW_COUNT)
+    check_budget("MainOrchestrator.execute_pipeline", measured)
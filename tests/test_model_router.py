@@ -0,0 +1,64 @@
+"""
+Test cases for routing Terraform generation between models
+"""
+from devops_platform_agent.src.utils.model_router import ModelRouter
+from devops_platform_agent.src.utils.terraform_generator import TerraformGenerator
+
+VALID_TERRAFORM = """
+resource "aws_vpc" "main" {
+  cidr_block = "10.0.0.0/16"
+}
+"""
+
+def make_router(stub_llm, fast_output: str, large_output: str = VALID_TERRAFORM) -> ModelRouter:
+    """Create a router whose models answer with fixed content"""
+    llms = {"fast-model": stub_llm(fast_output), "large-model": stub_llm(large_output)}
+    router = ModelRouter(fast_model="fast-model", large_model="large-model", llm_factory=llms.__getitem__)
+    router.stub_llms = llms
+    return router
+
+def test_simple_requests_route_to_fast_model():
+    """Test complexity scoring picks the fast model for small requests only"""
+    router = ModelRouter()
+
+    assert router.route("Create a VPC", "aws", ["vpc", "subnet"]) == "fast"
+    assert router.route("Create a VPC", "azure", ["vpc", "subnet", "security_group", "rds"]) == "large"
+    assert router.route("x" * 1000, "aws", ["vpc"]) == "large"
+
+def test_valid_fast_output_is_not_escalated(stub_llm):
+    """Test a valid fast-model answer is returned without calling the large model"""
+    router = make_router(stub_llm, VALID_TERRAFORM)
+    generator = TerraformGenerator(router=router)
+
+    config = generator.generate("Create a database", "aws", "us-east-1", ["rds"])
+
+    assert config["resources"][0]["type"] == "aws_vpc"
+    assert router.stub_llms["large-model"].calls == 0
+    stats = router.stats()
+    assert stats["routes"]["fast"]["calls"] == 1
+    assert stats["escalation_rate"] == 0.0
+
+def test_invalid_fast_output_escalates_to_large_model(stub_llm):
+    """Test output failing validation is regenerated by the large model"""
+    router = make_router(stub_llm, "I cannot help with that")
+    generator = TerraformGenerator(router=router)
+
+    config = generator.generate("Create a database", "aws", "us-east-1", ["rds"])
+
+    assert generator.validate(config)["valid"]
+    assert router.stub_llms["large-model"].calls == 1
+    stats = router.stats()
+    assert stats["routes"]["fast"]["escalations"] == 1
+    assert stats["routes"]["large"]["calls"] == 1
+    assert stats["escalation_rate"] == 1.0
+    assert stats["routes"]["large"]["p95_latency"] >= 0.0
+
+def test_explicit_llm_disables_routing(stub_llm):
+    """Test an injected model is used directly"""
+    llm = stub_llm(VALID_TERRAFORM)
+    generator = TerraformGenerator(llm=llm)
+
+    generator.generate("Create a database", "aws", "us-east-1", ["rds"])
+
+    assert generator.router is None
+    assert llm.calls == 1
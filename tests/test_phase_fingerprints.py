@@ -0,0 +1,137 @@
+"""
+Test cases for per-phase input fingerprints
+"""
+import json
+import pytest
+from devops_platform_agent import main
+from devops_platform_agent.main import run_devops_workflow
+from devops_platform_agent.src.models.state import DevOpsState
+from devops_platform_agent.src.utils.fingerprint import PhaseFingerprints
+
+SPECS = {
+    "infra": {"inputs": ["infra_data.region"], "outputs": ["infra_data.terraform_config"], "upstream": []},
+    "cicd": {"inputs": ["project_name"], "outputs": ["cicd_data"], "upstream": ["infra"]}
+}
+
+@pytest.mark.asyncio
+async def test_rerun_reuses_unchanged_phases(monkeypatch):
+    """Test a rerun with the same request reuses the stored CI/CD outputs"""
+    first = await run_devops_workflow("Create Python application")
+    
+    calls = []
+    async def counting_cicd_agent(state):
+        calls.append(state.user_request)
+        return {"error": "CI/CD agent should not run"}
+    monkeypatch.setattr(main, "cicd_agent_node", counting_cicd_agent)
+    
+    second = await run_devops_workflow("Create Python application", previous_state=first)
+    
+    assert calls == []
+    assert second.cicd_data == first.cicd_data
+    assert second.final_response == "All DevOps phases completed successfully"
+
+@pytest.mark.asyncio
+async def test_ci_targets_change_keeps_k8s_outputs(monkeypatch):
+    """Test changing the CI targets reruns CI/CD but reuses the Kubernetes manifests"""
+    first = await run_devops_workflow("Create Python application")
+    
+    calls = []
+    async def counting_k8s_agent(state):
+        calls.append(state.user_request)
+        return {"error": "Kubernetes agent should not run"}
+    monkeypatch.setattr(main, "k8s_agent_node", counting_k8s_agent)
+    
+    second = await run_devops_workflow("Create Python application", previous_state=first,
+                                       ci_targets=["gitlab", "github"])
+    
+    assert calls == []
+    assert ".github/workflows/ci.yml" in second.cicd_data
+    assert second.k8s_data == first.k8s_data
+
+def test_changed_input_invalidates_only_its_phase():
+    """Test changing the region only invalidates phases that consumed it"""
+    fingerprints = PhaseFingerprints(SPECS)
+    state = DevOpsState(user_request="Deploy app", project_name="web", infra_data={"region": "us-east-1"})
+    
+    for phase in ("infra", "cicd"):
+        fingerprint = fingerprints.compute(phase, state)
+        if phase == "infra":
+            state.infra_data["terraform_config"] = {"provider": "aws", "resources": []}
+        else:
+            state.cicd_data = {"project_name": "web"}
+        fingerprints.record(phase, state, fingerprint, {"status": "success"})
+    
+    state.infra_data["region"] = "eu-west-1"
+    
+    assert not fingerprints.is_current("infra", state)
+    assert fingerprints.changed_inputs("infra", state) == ["infra_data.region"]
+    assert fingerprints.is_current("cicd", state)
+
+def test_restore_writes_outputs_into_fresh_state():
+    """Test stored outputs are restored into a state seeded from a previous run"""
+    fingerprints = PhaseFingerprints(SPECS)
+    previous = DevOpsState(user_request="Deploy app", infra_data={"region": "us-east-1"})
+    fingerprint = fingerprints.compute("infra", previous)
+    previous.infra_data["terraform_config"] = {"provider": "aws"}
+    fingerprints.record("infra", previous, fingerprint, {"status": "success"})
+    
+    state = DevOpsState(user_request="Deploy app", infra_data={"region": "us-east-1"})
+    PhaseFingerprints.inherit(state, previous)
+    
+    assert fingerprints.is_current("infra", state)
+    assert fingerprints.restore("infra", state) == {"status": "success"}
+    assert state.infra_data["terraform_config"] == {"provider": "aws"}
+
+@pytest.mark.asyncio
+async def test_recorded_outputs_are_not_copied():
+    """Test recording a phase keeps a single copy of its outputs in the state"""
+    state = await run_devops_workflow("Create Python application", services=[{"name": "api"}, {"name": "web"}])
+    
+    assert state.phase_outputs["k8s"]["result"]["k8s_data"] == {"$output": "k8s_data"}
+    assert "outputs" not in state.phase_outputs["k8s"]
+    assert state.model_dump_json().count("kind: Deployment\\nmetadata") == 2
+
+@pytest.mark.asyncio
+async def test_policy_change_forces_rescan(monkeypatch, tmp_path):
+    """Test a changed policy file reruns the security scan on a rerun"""
+    first = await run_devops_workflow("Create Python application")
+    
+    policy_file = tmp_path / "policy.json"
+    policy_file.write_text(json.dumps([{
+        "id": "K8S100", "resource_type": "Service", "key_path": "metadata.annotations.owner",
+        "check": "required", "message": "Services should name an owner"
+    }]))
+    monkeypatch.setenv("DEVOPS_AGENT_POLICY_FILE", str(policy_file))
+    
+    second = await run_devops_workflow("Create Python application", previous_state=first)
+    
+    assert second.security_data["rules"] == first.security_data["rules"] + 1
+    assert [finding["rule_id"] for finding in second.security_data["findings"]] == ["K8S100"]
+    assert second.cicd_data == first.cicd_data
+
+@pytest.mark.asyncio
+async def test_pipeline_reruns_infra_only_when_its_inputs_change(orchestrator_module, stub_llm):
+    """Test the orchestrator reuses infra unless a field InfraAgent reads changes"""
+    from src.agents.infra_agent import InfraAgent
+    from src.models.state import DevOpsState as OrchestratorState
+    
+    llm = stub_llm('resource "aws_db_instance" "main" {\n  storage_encrypted = true\n}')
+    orchestrator = orchestrator_module.MainOrchestrator(infra_agent=InfraAgent(llm=llm))
+    def new_state(**infra_data):
+        return OrchestratorState(user_request="Deploy a database",
+                                 infra_data={"region": "us-east-1", "resources": ["rds"], **infra_data})
+    
+    first = new_state()
+    await orchestrator.execute_pipeline(first)
+    
+    # Fields InfraAgent does not read leave the stored outputs current
+    unchanged = new_state(vpc_cidr="10.1.0.0/16")
+    result = await orchestrator.execute_pipeline(unchanged, previous_state=first)
+    assert result["reused_phases"] == ["infra"]
+    assert unchanged.infra_data["terraform_config"] == first.infra_data["terraform_config"]
+    assert llm.calls == 1
+    
+    moved = new_state(region="eu-west-1")
+    result = await orchestrator.execute_pipeline(moved, previous_state=first)
+    assert result["reused_phases"] == []
+    assert llm.calls == 2
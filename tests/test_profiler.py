@@ -0,0 +1,99 @@
+"""
+Test cases for per-run workflow profiling
+"""
+import asyncio
+import json
+import time
+import pytest
+from devops_platform_agent.main import run_devops_workflow
+from devops_platform_agent.src.utils.profiler import WorkflowProfiler
+
+@pytest.mark.asyncio
+async def test_workflow_profiling_writes_outputs(tmp_path):
+    """Test profiled workflow writes CPU profile, flamegraph and phase breakdown"""
+    state = await run_devops_workflow(
+        "Create Python application",
+        profile=True,
+        profile_dir=str(tmp_path)
+    )
+    
+    profile = state.profile_data
+    assert (tmp_path / f"{profile['run_id']}.folded").exists()
+    assert (tmp_path / f"{profile['run_id']}.prof").exists()
+    assert "cicd_agent" in profile["phases"]
+    
+    with open(profile["phase_report"]) as f:
+        report = json.load(f)
+    assert [span["phase"] for span in report["timeline"]][:2] == ["supervisor", "cicd_agent"]
+
+@pytest.mark.asyncio
+async def test_workflow_profiling_disabled_by_default(tmp_path):
+    """Test workflows are not profiled unless requested"""
+    state = await run_devops_workflow("Create Python application", profile_dir=str(tmp_path))
+    
+    assert state.profile_data is None
+    assert state.final_response == "All DevOps phases completed successfully"
+    assert not any(tmp_path.iterdir())
+
+async def _busy_run(profiler: WorkflowProfiler, marker: str) -> WorkflowProfiler:
+    """Burn CPU in a function named after the run, yielding to other tasks"""
+    # Spins outlast the 5ms GIL switch interval so the sampler gets to run
+    def spin():
+        deadline = time.perf_counter() + 0.02
+        while time.perf_counter() < deadline:
+            pass
+    spin.__code__ = spin.__code__.replace(co_name=marker)
+
+    profiler.start()
+    try:
+        for _ in range(5):
+            spin()
+            await asyncio.sleep(0)
+    finally:
+        profiler.stop()
+    return profiler
+
+@pytest.mark.asyncio
+async def test_concurrent_profiles_stay_separate(tmp_path):
+    """Test concurrent runs keep their own samples and only one holds cProfile"""
+    first, second = await asyncio.gather(
+        _busy_run(WorkflowProfiler("first", str(tmp_path)), "spin_first"),
+        _busy_run(WorkflowProfiler("second", str(tmp_path)), "spin_second")
+    )
+
+    first_stacks = " ".join(first._stacks)
+    second_stacks = " ".join(second._stacks)
+    assert "spin_first" in first_stacks and "spin_second" not in first_stacks
+    assert "spin_second" in second_stacks and "spin_first" not in second_stacks
+    assert (first._cpu_profile is None) != (second._cpu_profile is None)
+
+    # The CPU profiler is free again once both runs stopped
+    third = await _busy_run(WorkflowProfiler("third", str(tmp_path)), "spin_third")
+    assert third._cpu_profile is not None
+    assert "cpu_profile" in third.write()
+
+@pytest.mark.asyncio
+async def test_pipeline_profiling_writes_outputs(tmp_path, orchestrator_module, stub_llm):
+    """Test a profiled pipeline writes its profile and phase breakdown"""
+    from src.agents.infra_agent import InfraAgent
+    from src.models.state import DevOpsState
+
+    orchestrator = orchestrator_module.MainOrchestrator(infra_agent=InfraAgent(
+        llm=stub_llm('resource "aws_db_instance" "main" {\n  storage_encrypted = true\n}')
+    ))
+    state = DevOpsState(
+        user_request="Deploy a web application",
+        infra_data={"cloud_provider": "aws", "region": "us-east-1", "resources": ["rds"]}
+    )
+
+    result = await orchestrator.execute_pipeline(state, profile=True, profile_dir=str(tmp_path))
+
+    profile = result["profile"]
+    assert profile is state.profile_data
+    assert (tmp_path / f"{profile['run_id']}.prof").exists()
+    assert (tmp_path / f"{profile['run_id']}.folded").exists()
+    assert set(profile["phases"]) == {"infra", "app", "cicd"}
+
+    with open(profile["phase_report"]) as f:
+        report = json.load(f)
+    assert [span["phase"] for span in report["timeline"]] == ["infra", "app", "cicd"]
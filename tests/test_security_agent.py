@@ -0,0 +1,132 @@
+"""
+Test cases for the security agent
+"""
+import pytest
+from devops_platform_agent import security_agent
+from devops_platform_agent.security_agent import (
+    security_agent_node, scan_artifacts, load_rules, PolicyIndex, _scan_inline
+)
+from devops_platform_agent.k8s_agent import build_workloads, iter_manifests
+from devops_platform_agent.main import run_devops_workflow
+from devops_platform_agent.models import DevOpsPlatformState
+
+SECURITY_GROUP_BODY = """
+  name   = "web"
+  vpc_id = aws_vpc.main.id
+
+  ingress {
+    from_port   = 443
+    to_port     = 443
+    protocol    = "tcp"
+    cidr_blocks = ["0.0.0.0/0"]
+  }
+
+  tags = {
+    Name = "web"
+  }
+"""
+
+@pytest.mark.asyncio
+async def test_security_agent_scans_workflow_artifacts():
+    """Test generated CI and Kubernetes artifacts pass the default rules"""
+    state = await run_devops_workflow("Create Python application")
+    
+    security_data = state.security_data
+    assert security_data["artifacts_scanned"] == 5
+    assert security_data["findings"] == []
+
+@pytest.mark.asyncio
+async def test_security_agent_reports_insecure_manifests():
+    """Test Kubernetes manifests are checked against the Deployment rules"""
+    workloads = build_workloads([{"name": "api"}])
+    manifests = {
+        path: document.replace("runAsNonRoot: true", "runAsNonRoot: false")
+        for path, document in iter_manifests(workloads)
+    }
+    state = DevOpsPlatformState(user_request="Deploy api", k8s_data={"manifests": manifests})
+    result = await security_agent_node(state)
+    
+    assert [finding["rule_id"] for finding in result["security_data"]["findings"]] == ["K8S001"]
+
+@pytest.mark.asyncio
+async def test_security_agent_scans_terraform_resources():
+    """Test Terraform resources are checked against rules for their type, including nested blocks"""
+    state = DevOpsPlatformState(
+        user_request="Create web infrastructure",
+        infra_data={"terraform_config": {"resources": [
+            {"type": "aws_security_group", "name": "web", "body": SECURITY_GROUP_BODY},
+            {"type": "aws_vpc", "name": "main", "body": 'cidr_block = "10.0.0.0/16"'}
+        ]}}
+    )
+    result = await security_agent_node(state)
+    
+    findings = result["security_data"]["findings"]
+    assert [(finding["rule_id"], finding["artifact"]) for finding in findings] == [
+        ("TF002", "terraform/aws_security_group.web")
+    ]
+
+def test_rules_are_indexed_by_resource_type():
+    """Test an artifact is only checked against rules for its resource type"""
+    index = PolicyIndex(load_rules())
+    
+    deployment_paths = {rule.key_path for _, rules in index.rules_for("Deployment") for rule, _, _ in rules}
+    assert deployment_paths
+    assert all(path.startswith("spec.") for path in deployment_paths)
+    assert list(index.rules_for("aws_vpc")) == []
+
+def test_parallel_scan_matches_inline_scan():
+    """Test large batches scanned across processes give the same findings"""
+    workloads = build_workloads([{"name": f"service-{i}"} for i in range(100)])
+    artifacts = [
+        (path, "k8s", "yaml", document.replace("allowPrivilegeEscalation: false", "allowPrivilegeEscalation: true"))
+        for path, document in iter_manifests(workloads)
+    ]
+    rules = load_rules()
+    
+    parallel = scan_artifacts(artifacts, rules, max_workers=2)
+    inline = _scan_inline(PolicyIndex(rules), artifacts)
+    
+    assert len(artifacts) == 400
+    assert len(inline) == 100
+    assert parallel == inline
+
+def test_parallel_scans_reuse_one_pool():
+    """Test repeated large scans share a process pool"""
+    workloads = build_workloads([{"name": f"service-{i}"} for i in range(100)])
+    artifacts = [(path, "k8s", "yaml", document) for path, document in iter_manifests(workloads)]
+    rules = load_rules()
+    
+    try:
+        scan_artifacts(artifacts, rules, max_workers=2)
+        pool = security_agent._pool
+        scan_artifacts(artifacts, rules, max_workers=2)
+        
+        assert pool is not None
+        assert security_agent._pool is pool
+    finally:
+        security_agent.shutdown_pool()
+
+def test_single_worker_scans_inline():
+    """Test one scan worker scans in process without starting a pool"""
+    workloads = build_workloads([{"name": f"service-{i}"} for i in range(100)])
+    artifacts = [(path, "k8s", "yaml", document) for path, document in iter_manifests(workloads)]
+    rules, index = security_agent.get_policy()
+    pool = security_agent._pool
+    
+    assert scan_artifacts(artifacts, rules, index, max_workers=1) == []
+    assert security_agent._pool is pool
+
+@pytest.mark.asyncio
+async def test_security_agent_scans_every_ci_target():
+    """Test GitHub Actions and Jenkins pipelines are scanned like GitLab CI"""
+    state = await run_devops_workflow("Create Python application", ci_targets=["github", "jenkins"])
+    assert state.security_data["artifacts_scanned"] == 6
+    assert state.security_data["findings"] == []
+    
+    state = DevOpsPlatformState(user_request="Deploy", cicd_data={
+        ".github/workflows/ci.yml": "jobs:\n  build:\n    container: node\n    steps:\n      - run: curl -s https://x.sh | bash\n",
+        "Jenkinsfile": "pipeline {\n  agent { docker { image 'node:latest' } }\n}\n"
+    })
+    result = await security_agent_node(state)
+    
+    assert sorted(finding["rule_id"] for finding in result["security_data"]["findings"]) == ["GH001", "GH002", "JK001"]
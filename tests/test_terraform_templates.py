@@ -0,0 +1,78 @@
+"""
+Test cases for the Terraform template library
+"""
+from devops_platform_agent.src.utils.terraform_generator import TerraformGenerator
+from devops_platform_agent.src.utils.terraform_templates import TerraformTemplates
+from devops_platform_agent.security_agent import scan_artifacts, load_rules
+
+def test_covered_request_renders_without_llm(stub_llm):
+    """Test a VPC, subnet and security group request never reaches the LLM"""
+    llm = stub_llm()
+    generator = TerraformGenerator(llm=llm)
+
+    config = generator.generate("Create a network", "aws", "us-west-2", ["vpc", "subnet", "Security Group"])
+
+    assert llm.calls == 0
+    assert config["source"] == "template"
+    assert config["provider"] == "aws"
+    assert [resource["type"] for resource in config["resources"]] == ["aws_vpc", "aws_subnet", "aws_security_group"]
+    assert 'availability_zone = "us-west-2a"' in config["resources"][1]["body"]
+    assert generator.validate(config)["valid"]
+
+def test_templates_add_required_resources():
+    """Test dependencies such as the Azure resource group are rendered too"""
+    config = TerraformTemplates().render("azure", "westeurope", ["subnet"])
+
+    assert config["provider"] == "azurerm"
+    assert [resource["type"] for resource in config["resources"]] == [
+        "azurerm_resource_group", "azurerm_virtual_network", "azurerm_subnet"
+    ]
+    assert '"10.0.0.0/24"' in config["resources"][2]["body"]
+
+def test_uncovered_resources_fall_back_to_llm(stub_llm):
+    """Test only the resources without templates are sent to the LLM"""
+    llm = stub_llm('resource "aws_db_instance" "main" {\n  storage_encrypted = true\n}')
+    generator = TerraformGenerator(llm=llm)
+
+    config = generator.generate("Create a VPC with a database", "aws", "us-east-1", ["vpc", "rds"])
+
+    assert llm.calls == 1
+    assert "Resources to include: rds" in llm.last_prompt
+    assert config["source"] == "template+llm"
+    assert [resource["type"] for resource in config["resources"]] == ["aws_vpc", "aws_db_instance"]
+
+def test_llm_redefinitions_of_templated_resources_are_dropped(stub_llm):
+    """Test LLM resources at a templated address are dropped and others of the same type kept"""
+    llm = stub_llm(
+        'resource "aws_vpc" "main" {\n  cidr_block = "10.1.0.0/16"\n}\n\n'
+        'resource "aws_subnet" "private" {\n  vpc_id = aws_vpc.main.id\n}\n\n'
+        'output "private_subnet_id" {\n  value = aws_subnet.private.id\n}\n'
+    )
+    generator = TerraformGenerator(llm=llm)
+
+    config = generator.generate("Create a network", "aws", "us-east-1", ["vpc", "subnet", "private subnet"])
+
+    assert "reference these and do not redefine them: aws_vpc.main, aws_subnet.main" in llm.last_prompt
+    assert [f"{resource['type']}.{resource['name']}" for resource in config["resources"]] == [
+        "aws_vpc.main", "aws_subnet.main", "aws_subnet.private"
+    ]
+    assert 'cidr_block           = "10.0.0.0/16"' in config["resources"][0]["body"]
+    assert {"name": "private_subnet_id", "body": "value = aws_subnet.private.id"} in config["outputs"]
+
+def test_unsupported_region_falls_back_to_llm():
+    """Test regions missing from the provider config are left to the LLM"""
+    templates = TerraformTemplates()
+
+    assert templates.covers("gcp", "us-central1", ["vpc"])
+    assert not templates.covers("gcp", "mars-north1", ["vpc"])
+    assert not templates.covers("aws", "us-east-1", [])
+
+def test_templates_pass_default_policies():
+    """Test rendered resources raise no findings from the default policy rules"""
+    config = TerraformTemplates().render("aws", "us-east-1", ["vpc", "subnet", "security_group"])
+    artifacts = [
+        (f"terraform/{resource['type']}.{resource['name']}", resource["type"], "hcl", resource["body"])
+        for resource in config["resources"]
+    ]
+
+    assert scan_artifacts(artifacts, load_rules()) == []
@@ -0,0 +1,76 @@
+"""
+Test cases for the durable work queue
+"""
+import json
+import pytest
+from devops_platform_agent.work_queue import WorkQueue, run_workers
+
+@pytest.fixture
+def requests_file(tmp_path):
+    """A requests.jsonl-style file with three requests"""
+    path = tmp_path / "requests.jsonl"
+    lines = [
+        {"request_id": "req-1", "title": "Node app", "body": "Create Node.js application"},
+        {"request_id": "req-2", "title": "Python app", "body": "Create Python application"},
+        {"request_id": "req-3", "title": "Java app", "body": "Create Java application", "profile": False}
+    ]
+    path.write_text("\n".join(json.dumps(line) for line in lines) + "\n")
+    return path
+
+def test_ingest_is_idempotent(tmp_path, requests_file):
+    """Test re-ingesting a file does not duplicate requests"""
+    queue = WorkQueue(str(tmp_path / "queue.db"))
+    
+    assert queue.ingest(str(requests_file)) == 3
+    assert queue.ingest(str(requests_file)) == 0
+    assert queue.stats() == {"pending": 3}
+
+def test_expired_lease_is_released_and_stale_result_rejected(tmp_path, requests_file):
+    """Test an expired lease is re-leased and only the new holder records a result"""
+    queue = WorkQueue(str(tmp_path / "queue.db"))
+    queue.ingest(str(requests_file))
+    
+    stale = queue.lease("worker-a", visibility_timeout=-1)
+    fresh = queue.lease("worker-b")
+    
+    assert fresh["request_id"] == stale["request_id"]
+    assert fresh["attempt"] == 2
+    assert not queue.complete(stale, {"final_response": "stale"})
+    assert queue.complete(fresh, {"final_response": "fresh"})
+    assert not queue.complete(fresh, {"final_response": "again"})
+    assert queue.result(fresh["request_id"]) == {"final_response": "fresh"}
+
+def test_dead_worker_jobs_are_released(tmp_path, requests_file):
+    """Test jobs leased by a dead worker become available immediately"""
+    queue = WorkQueue(str(tmp_path / "queue.db"))
+    queue.ingest(str(requests_file))
+    queue.lease("dead-worker")
+    
+    assert queue.release_owner("dead-worker") == 1
+    assert queue.stats() == {"pending": 3}
+
+def test_job_fails_after_max_attempts(tmp_path, requests_file):
+    """Test a job is not retried forever"""
+    queue = WorkQueue(str(tmp_path / "queue.db"), max_attempts=2)
+    queue.ingest(str(requests_file))
+    
+    for _ in range(2):
+        job = queue.lease("worker")
+        assert job["request_id"] == "req-1"
+        queue.fail(job, "boom")
+    
+    assert queue.lease("worker")["request_id"] == "req-2"
+    assert queue.stats()["failed"] == 1
+
+def test_run_workers_processes_every_request_once(tmp_path, requests_file):
+    """Test worker processes drain the queue with one result per request"""
+    db_path = str(tmp_path / "queue.db")
+    queue = WorkQueue(db_path)
+    queue.ingest(str(requests_file))
+    
+    stats = run_workers(db_path, workers=2, poll_interval=0.05)
+    
+    assert stats == {"done": 3}
+    result = queue.result("req-2")
+    assert result["cicd_data"]["project_name"] == "python-app"
+    assert result["final_response"] == "All DevOps phases completed successfully"
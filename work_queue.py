@@ -0,0 +1,337 @@
+"""
+Durable local work queue for running DevOps workflows across worker processes
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import socket
+import sqlite3
+import time
+import uuid
+from typing import Dict, Any, List, Optional
+from devops_platform_agent.logging_config import logger
+from devops_platform_agent.main import run_devops_workflow
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    request_id TEXT NOT NULL UNIQUE,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_token TEXT,
+    lease_expires REAL,
+    last_error TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, lease_expires);
+CREATE TABLE IF NOT EXISTS results (
+    request_id TEXT PRIMARY KEY,
+    result TEXT NOT NULL,
+    lease_owner TEXT NOT NULL,
+    completed_at REAL NOT NULL
+);
+"""
+
+class WorkQueue:
+    """
+    SQLite-backed queue that leases workflow requests to workers
+
+    Jobs are leased for a visibility timeout; a lease that is not completed
+    or extended in time becomes available again. Completing a job writes its
+    result and closes the lease in one transaction, and only the current
+    lease holder may do so, so every request has at most one recorded result.
+    """
+
+    def __init__(self, db_path: str, max_attempts: int = 3):
+        self.db_path = db_path
+        self.max_attempts = max_attempts
+        self.conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=FULL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        """Close the database connection"""
+        self.conn.close()
+
+    def _transaction(self):
+        """Start a write transaction that holds the lock for its whole duration"""
+        return _ImmediateTransaction(self.conn)
+
+    def enqueue(self, request_id: str, payload: Dict[str, Any]) -> bool:
+        """Add a request; returns False if the request id is already queued"""
+        cursor = self.conn.execute(
+            "INSERT OR IGNORE INTO jobs (request_id, payload, updated_at) VALUES (?, ?, ?)",
+            (request_id, json.dumps(payload), time.time())
+        )
+        return cursor.rowcount == 1
+
+    def ingest(self, path: str) -> int:
+        """
+        Enqueue every line of a requests.jsonl-style file
+
+        Lines need a ``body`` or ``user_request``; ``request_id`` defaults to
+        the file name and line number so re-ingesting a file is a no-op.
+        """
+        added = 0
+        with open(path) as f, self._transaction():
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                request_id = entry.get("request_id") or f"{os.path.basename(path)}:{line_number}"
+                payload = {
+                    "user_request": entry.get("user_request") or entry.get("body") or entry.get("title", ""),
+                    "profile": entry.get("profile", False),
+                    "services": entry.get("services"),
+                    "ci_targets": entry.get("ci_targets"),
+                    "manifest_dir": entry.get("manifest_dir")
+                }
+                added += self.enqueue(request_id, payload)
+
+        logger.info("Requests ingested", path=path, added=added)
+        return added
+
+    def lease(self, owner: str, visibility_timeout: float = 300.0) -> Optional[Dict[str, Any]]:
+        """Lease the next pending or expired job to ``owner``"""
+        now = time.time()
+        with self._transaction():
+            # Jobs out of attempts (expired on the last try or released by
+            # dead workers too often) are failed rather than leased again
+            self.conn.execute(
+                "UPDATE jobs SET status = 'failed', lease_owner = NULL, lease_token = NULL, "
+                "last_error = COALESCE(last_error, 'lease expired'), updated_at = ? "
+                "WHERE (status = 'pending' OR (status = 'leased' AND lease_expires < ?)) AND attempts >= ?",
+                (now, now, self.max_attempts)
+            )
+            row = self.conn.execute(
+                "SELECT id, request_id, payload, attempts FROM jobs "
+                "WHERE status = 'pending' OR (status = 'leased' AND lease_expires < ?) "
+                "ORDER BY id LIMIT 1",
+                (now,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            token = uuid.uuid4().hex
+            self.conn.execute(
+                "UPDATE jobs SET status = 'leased', attempts = attempts + 1, lease_owner = ?, "
+                "lease_token = ?, lease_expires = ?, updated_at = ? WHERE id = ?",
+                (owner, token, now + visibility_timeout, now, row["id"])
+            )
+
+        return {
+            "id": row["id"],
+            "request_id": row["request_id"],
+            "payload": json.loads(row["payload"]),
+            "attempt": row["attempts"] + 1,
+            "owner": owner,
+            "token": token
+        }
+
+    def heartbeat(self, job: Dict[str, Any], visibility_timeout: float = 300.0) -> bool:
+        """Extend a lease; returns False if the lease was lost"""
+        cursor = self.conn.execute(
+            "UPDATE jobs SET lease_expires = ?, updated_at = ? "
+            "WHERE id = ? AND status = 'leased' AND lease_token = ?",
+            (time.time() + visibility_timeout, time.time(), job["id"], job["token"])
+        )
+        return cursor.rowcount == 1
+
+    def complete(self, job: Dict[str, Any], result: Dict[str, Any]) -> bool:
+        """
+        Record a job's result if the caller still holds its lease
+
+        Returns False when the lease was lost to another worker, in which
+        case nothing is recorded.
+        """
+        now = time.time()
+        with self._transaction():
+            cursor = self.conn.execute(
+                "UPDATE jobs SET status = 'done', lease_token = NULL, lease_expires = NULL, updated_at = ? "
+                "WHERE id = ? AND status = 'leased' AND lease_token = ?",
+                (now, job["id"], job["token"])
+            )
+            if cursor.rowcount != 1:
+                return False
+            self.conn.execute(
+                "INSERT INTO results (request_id, result, lease_owner, completed_at) VALUES (?, ?, ?, ?)",
+                (job["request_id"], json.dumps(result, default=str), job["owner"], now)
+            )
+        return True
+
+    def fail(self, job: Dict[str, Any], error: str) -> bool:
+        """Release a failed job for retry, or mark it failed after the last attempt"""
+        cursor = self.conn.execute(
+            "UPDATE jobs SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+            "lease_owner = NULL, lease_token = NULL, lease_expires = NULL, last_error = ?, updated_at = ? "
+            "WHERE id = ? AND status = 'leased' AND lease_token = ?",
+            (self.max_attempts, error, time.time(), job["id"], job["token"])
+        )
+        return cursor.rowcount == 1
+
+    def release_owner(self, owner: str) -> int:
+        """Make every job leased by a dead worker available again"""
+        cursor = self.conn.execute(
+            "UPDATE jobs SET status = 'pending', lease_owner = NULL, lease_token = NULL, "
+            "lease_expires = NULL, updated_at = ? WHERE status = 'leased' AND lease_owner = ?",
+            (time.time(), owner)
+        )
+        if cursor.rowcount:
+            logger.warning("Released jobs of dead worker", owner=owner, jobs=cursor.rowcount)
+        return cursor.rowcount
+
+    def result(self, request_id: str) -> Optional[Dict[str, Any]]:
+        """Return the recorded result of a request"""
+        row = self.conn.execute("SELECT result FROM results WHERE request_id = ?", (request_id,)).fetchone()
+        return json.loads(row["result"]) if row else None
+
+    def stats(self) -> Dict[str, int]:
+        """Count jobs by status"""
+        rows = self.conn.execute("SELECT status, COUNT(*) AS count FROM jobs GROUP BY status").fetchall()
+        return {row["status"]: row["count"] for row in rows}
+
+    def has_open_work(self) -> bool:
+        """Check whether any job is pending or leased"""
+        row = self.conn.execute("SELECT 1 FROM jobs WHERE status IN ('pending', 'leased') LIMIT 1").fetchone()
+        return row is not None
+
+class _ImmediateTransaction:
+    """Context manager for a ``BEGIN IMMEDIATE`` transaction"""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+
+async def _run_job(queue: WorkQueue, job: Dict[str, Any], visibility_timeout: float) -> Dict[str, Any]:
+    """Run one leased workflow while keeping its lease alive"""
+    async def keep_lease():
+        while True:
+            await asyncio.sleep(visibility_timeout / 3)
+            queue.heartbeat(job, visibility_timeout)
+
+    heartbeat = asyncio.create_task(keep_lease())
+    try:
+        payload = job["payload"]
+        state = await run_devops_workflow(
+            payload["user_request"],
+            profile=payload.get("profile", False),
+            services=payload.get("services"),
+            ci_targets=payload.get("ci_targets"),
+            manifest_dir=payload.get("manifest_dir")
+        )
+    finally:
+        heartbeat.cancel()
+
+    return state.model_dump(mode="json")
+
+def worker_main(db_path: str, owner: str, visibility_timeout: float = 300.0, poll_interval: float = 0.5,
+                scan_workers: Optional[int] = None):
+    """
+    Lease and run workflows until the queue has no open work
+
+    ``scan_workers`` limits the processes of this worker's security scans.
+    """
+    if scan_workers:
+        os.environ["DEVOPS_AGENT_SCAN_WORKERS"] = str(scan_workers)
+    queue = WorkQueue(db_path)
+    try:
+        while True:
+            job = queue.lease(owner, visibility_timeout)
+            if job is None:
+                if not queue.has_open_work():
+                    return
+                time.sleep(poll_interval)
+                continue
+
+            try:
+                result = asyncio.run(_run_job(queue, job, visibility_timeout))
+            except Exception as e:
+                logger.error("Workflow failed", request_id=job["request_id"], error=str(e))
+                queue.fail(job, str(e))
+                continue
+
+            if not queue.complete(job, result):
+                logger.warning("Lease lost before completion, result discarded", request_id=job["request_id"])
+    finally:
+        queue.close()
+
+def run_workers(db_path: str, workers: Optional[int] = None, visibility_timeout: float = 300.0,
+                poll_interval: float = 0.5) -> Dict[str, int]:
+    """
+    Run ``workers`` processes until the queue is drained
+
+    Workers that die are replaced and their leased jobs released at once
+    rather than after the visibility timeout.
+    """
+    workers = workers or os.cpu_count() or 1
+    # Share the cores between the workers' security scan pools
+    scan_workers = max((os.cpu_count() or 1) // workers, 1)
+    queue = WorkQueue(db_path)
+    processes: Dict[str, multiprocessing.Process] = {}
+
+    def spawn():
+        owner = f"{socket.gethostname()}-{uuid.uuid4().hex[:8]}"
+        process = multiprocessing.Process(
+            target=worker_main,
+            args=(db_path, owner, visibility_timeout, poll_interval, scan_workers),
+            name=owner
+        )
+        process.start()
+        processes[owner] = process
+
+    try:
+        for _ in range(workers):
+            spawn()
+
+        while processes:
+            time.sleep(poll_interval)
+            for owner, process in list(processes.items()):
+                if process.is_alive():
+                    continue
+                del processes[owner]
+                if process.exitcode != 0:
+                    logger.warning("Worker died", owner=owner, exitcode=process.exitcode)
+                    queue.release_owner(owner)
+                    if queue.has_open_work():
+                        spawn()
+
+        return queue.stats()
+    finally:
+        for process in processes.values():
+            process.terminate()
+        queue.close()
+
+def main(argv: Optional[List[str]] = None):
+    """
+    Ingest request files and process them with local worker processes
+    """
+    parser = argparse.ArgumentParser(description="Run DevOps workflows from a durable local queue")
+    parser.add_argument("requests", nargs="*", help="requests.jsonl-style files to ingest")
+    parser.add_argument("--db", default="workflows.db", help="queue database path")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--visibility-timeout", type=float, default=300.0, help="lease duration in seconds")
+    args = parser.parse_args(argv)
+
+    queue = WorkQueue(args.db)
+    try:
+        for path in args.requests:
+            queue.ingest(path)
+    finally:
+        queue.close()
+
+    stats = run_workers(args.db, args.workers, args.visibility_timeout)
+    print(json.dumps(stats))
+
+if __name__ == "__main__":
+    main()